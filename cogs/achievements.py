@@ -24,7 +24,7 @@ class AchievementsCog(commands.Cog, name="AchievementsCog"):
     def __init__(self, bot: GayborhoodBot):
         self.bot = bot
         self._ach_repo = AchievementRepository(bot.db)
-        self._user_repo = UserRepository(bot.db)
+        self._user_repo = UserRepository(bot.db, bot.user_cache, bot.rank_index)
 
     async def cog_load(self):
         count = await self._ach_repo.seed_defaults()
@@ -31,7 +31,7 @@ class AgeVerifyCog(commands.Cog, name="AgeVerifyCog"):
         if level != required:
             return
 
-        user_repo = UserRepository(self.bot.db)
+        user_repo = UserRepository(self.bot.db, self.bot.user_cache, self.bot.rank_index)
         user = await user_repo.get(user_id)
         if not user or user.age_verified:
             return
@@ -53,7 +53,7 @@ class AgeVerifyCog(commands.Cog, name="AgeVerifyCog"):
 
     async def start_verify(self, interaction: discord.Interaction):
         """Entry point from views."""
-        user_repo = UserRepository(self.bot.db)
+        user_repo = UserRepository(self.bot.db, self.bot.user_cache, self.bot.rank_index)
         user = await user_repo.get(interaction.user.id)
 
         if not user:
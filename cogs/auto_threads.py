@@ -90,7 +90,7 @@ class AutoThreadsCog(commands.Cog, name="AutoThreadsCog"):
 
         # Format thread name
         name_format = config.get("name_format", "{username} - {file_type}")
-        user_repo = UserRepository(self.bot.db)
+        user_repo = UserRepository(self.bot.db, self.bot.user_cache, self.bot.rank_index)
         db_user = await user_repo.get(message.author.id)
         level = db_user.level if db_user else 0
 
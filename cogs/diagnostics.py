@@ -16,7 +16,7 @@ logger = logging.getLogger(__name__)
 
 
 class DiagnosticsCog(commands.Cog, name="DiagnosticsCog"):
-    """Bot diagnostics: /ping, /version, /status, /reload-config."""
+    """Bot diagnostics: /ping, /version, /status, /reload-config, /backup-db."""
 
     def __init__(self, bot: GayborhoodBot):
         self.bot = bot
@@ -54,6 +54,49 @@ class DiagnosticsCog(commands.Cog, name="DiagnosticsCog"):
         embed.add_field(name="Cogs Loaded", value=str(len(self.bot.cogs)), inline=True)
         embed.add_field(name="Version", value=f"v{VERSION}", inline=True)
 
+        # Hot queries by total time spent (InstrumentedEngine only)
+        if hasattr(self.bot.db, "query_stats"):
+            lines = []
+            for q in self.bot.db.query_stats(limit=5):
+                sql = q["sql"] if len(q["sql"]) <= 60 else q["sql"][:57] + "..."
+                lines.append(
+                    f"`{q['count']}x` p50 {q['p50_ms']}ms / p95 {q['p95_ms']}ms / "
+                    f"p99 {q['p99_ms']}ms\n`{sql}`"
+                )
+            if lines:
+                embed.add_field(name="Hot Queries", value="\n".join(lines)[:1024], inline=False)
+
+        if hasattr(self.bot.db, "cache_stats"):
+            cache = self.bot.db.cache_stats()
+            lookups = cache["statement_hits"] + cache["statement_misses"]
+            hit_rate = cache["statement_hits"] / lookups * 100 if lookups else 0
+            embed.add_field(name="Statement Cache", value=f"{hit_rate:.1f}% hits ({lookups:,} lookups)", inline=True)
+
+        users = self.bot.user_cache.stats()
+        lookups = users["hits"] + users["misses"]
+        embed.add_field(
+            name="User Cache",
+            value=(
+                f"{users['hits'] / lookups * 100 if lookups else 0:.1f}% hits ({lookups:,} lookups)\n"
+                f"{users['size']:,}/{users['max_size']:,} rows"
+                if users["enabled"] else "Disabled"
+            ),
+            inline=True,
+        )
+
+        if hasattr(self.bot.db, "storage_stats"):
+            storage = await self.bot.db.storage_stats()
+            size_mb = storage["page_count"] * storage["page_size"] / 1024 / 1024
+            embed.add_field(
+                name="Storage",
+                value=(
+                    f"{size_mb:.1f} MB ({storage['page_count']:,} pages, "
+                    f"{storage['freelist_count']:,} free)\n"
+                    f"WAL {storage['wal_bytes'] / 1024 / 1024:.1f} MB"
+                ),
+                inline=True,
+            )
+
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @app_commands.command(name="reload-config", description="Hot-reload config.yaml (Staff only)")
@@ -61,6 +104,7 @@ class DiagnosticsCog(commands.Cog, name="DiagnosticsCog"):
     async def reload_config(self, interaction: discord.Interaction):
         try:
             self.bot.config.reload()
+            self.bot.user_cache.configure(self.bot.config.database.get("user_cache", {}))
             self.bot.dispatch("config_reloaded")
             await interaction.response.send_message(
                 "Configuration reloaded successfully.", ephemeral=True,
@@ -80,6 +124,40 @@ class DiagnosticsCog(commands.Cog, name="DiagnosticsCog"):
                 "You need administrator permissions to use this command.", ephemeral=True,
             )
 
+    @app_commands.command(name="backup-db", description="Take a database backup now (Staff only)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def backup_db(self, interaction: discord.Interaction):
+        if not self.bot.backup_service.supported:
+            await interaction.response.send_message(
+                "Online backups are only available for SQLite.", ephemeral=True,
+            )
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        try:
+            result = await self.bot.backup_service.run()
+        except Exception as e:
+            logger.exception("Manual backup failed")
+            await interaction.followup.send(f"Backup failed: {e}", ephemeral=True)
+            return
+
+        await interaction.followup.send(
+            f"Backup written to `{result.path}` "
+            f"({result.size_bytes / 1024 / 1024:.1f} MB, {result.duration_seconds:.1f}s).",
+            ephemeral=True,
+        )
+        await self.bot.audit_logger.log(
+            "database_backup", actor_id=interaction.user.id,
+            details=f"{result.path} ({result.pages} pages)",
+        )
+
+    @backup_db.error
+    async def backup_db_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        if isinstance(error, app_commands.MissingPermissions):
+            await interaction.response.send_message(
+                "You need administrator permissions to use this command.", ephemeral=True,
+            )
+
 
 async def setup(bot: GayborhoodBot):
     await bot.add_cog(DiagnosticsCog(bot))
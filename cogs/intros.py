@@ -83,7 +83,7 @@ class IntroModal(discord.ui.Modal, title="Tell Us About Yourself!"):
 
         # Check submission count
         intro_repo = IntroRepository(self.bot.db)
-        user_repo = UserRepository(self.bot.db)
+        user_repo = UserRepository(self.bot.db, self.bot.user_cache, self.bot.rank_index)
         count = await intro_repo.count_for_user(interaction.user.id)
 
         if count >= 2:
@@ -202,7 +202,7 @@ class IntrosCog(commands.Cog, name="IntrosCog"):
     async def start_intro(self, interaction: discord.Interaction):
         """Called from onboarding/panel views."""
         # Check if user has agreed to rules
-        user_repo = UserRepository(self.bot.db)
+        user_repo = UserRepository(self.bot.db, self.bot.user_cache, self.bot.rank_index)
         user = await user_repo.get(interaction.user.id)
         if not user or not user.rules_agreed:
             await interaction.response.send_message(
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import re
 from collections import defaultdict
-from datetime import datetime, timezone
+from datetime import datetime, time, timedelta, timezone
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -51,13 +52,15 @@ class MonthlyStatsCog(commands.Cog, name="MonthlyStatsCog"):
     def __init__(self, bot: GayborhoodBot):
         self.bot = bot
         self._stats_repo = MonthlyStatsRepository(bot.db)
-        self._user_repo = UserRepository(bot.db)
+        self._user_repo = UserRepository(bot.db, bot.user_cache, bot.rank_index)
 
         # In-memory batch accumulators (flushed every 60s)
         self._msg_batch: dict[tuple[str, int], dict] = {}  # (date, user_id) -> stats
         self._channel_batch: dict[tuple[str, int, int], int] = {}  # (date, channel_id, user_id) -> count
         self._word_batch: dict[tuple[str, str], int] = {}  # (date, word) -> count
         self._mention_batch: dict[tuple[str, int], int] = {}  # (date, mentioned_id) -> count
+        # message_id -> message_tracking row; edits and reactions land here until the flush
+        self._tracking_batch: dict[int, list] = {}
 
     async def cog_load(self):
         global STOP_WORDS
@@ -65,10 +68,12 @@ class MonthlyStatsCog(commands.Cog, name="MonthlyStatsCog"):
         logger.info("Loaded %d stop words", len(STOP_WORDS))
         self.flush_batch_loop.start()
         self.monthly_report_check.start()
+        self.retention_loop.start()
 
     async def cog_unload(self):
         self.flush_batch_loop.cancel()
         self.monthly_report_check.cancel()
+        self.retention_loop.cancel()
         # Final flush
         await self._flush_batches()
 
@@ -107,11 +112,11 @@ class MonthlyStatsCog(commands.Cog, name="MonthlyStatsCog"):
         word_count = len(content.split()) if content else 0
         has_attachment = bool(message.attachments)
 
-        # Track message in DB (for longest message / most reacted queries)
-        await self._stats_repo.track_message(
-            message.id, user_id, message.channel.id,
-            char_count, word_count, has_attachment,
-        )
+        # Batch: message tracking (for longest message / most reacted queries)
+        self._tracking_batch[message.id] = [
+            message.id, user_id, message.channel.id, char_count, word_count,
+            int(has_attachment), 0, 0, message.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        ]
 
         # Batch: daily stats
         key = (date, user_id)
@@ -159,7 +164,10 @@ class MonthlyStatsCog(commands.Cog, name="MonthlyStatsCog"):
         self._msg_batch[key]["edits"] += 1
 
         # Also mark in message_tracking
-        await self._stats_repo.mark_edited(after.id)
+        if (row := self._tracking_batch.get(after.id)) is not None:
+            row[7] = 1
+        else:
+            await self._stats_repo.mark_edited(after.id)
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
@@ -181,7 +189,10 @@ class MonthlyStatsCog(commands.Cog, name="MonthlyStatsCog"):
             self._msg_batch[key]["reactions_given"] += 1
 
         # Increment reaction count on the message itself
-        await self._stats_repo.increment_reaction(payload.message_id)
+        if (row := self._tracking_batch.get(payload.message_id)) is not None:
+            row[6] += 1
+        else:
+            await self._stats_repo.increment_reaction(payload.message_id)
 
     # ── Batch Flushing ────────────────────────────
 
@@ -195,25 +206,26 @@ class MonthlyStatsCog(commands.Cog, name="MonthlyStatsCog"):
 
     async def _flush_batches(self) -> None:
         """Flush in-memory batches to database."""
+        # Message tracking — a plain append, so it goes through bulk COPY
+        tracking = list(self._tracking_batch.values())
+        self._tracking_batch.clear()
+        if tracking:
+            await self._stats_repo.track_messages([tuple(row) for row in tracking])
+
         # Daily stats
         msg_batch = self._msg_batch.copy()
         self._msg_batch.clear()
         for (date, user_id), stats in msg_batch.items():
-            if stats["messages_sent"] > 0:
-                await self._stats_repo.increment_daily(date, user_id, "messages_sent", stats["messages_sent"])
-            if stats["edits"] > 0:
-                await self._stats_repo.increment_daily(date, user_id, "edits", stats["edits"])
-            if stats["reactions_given"] > 0:
-                await self._stats_repo.increment_daily(date, user_id, "reactions_given", stats["reactions_given"])
-            if stats["longest_message"] > 0:
-                await self._stats_repo.update_longest_message(date, user_id, stats["longest_message"])
+            # One upsert per user: counters are added, longest_message keeps the max
+            changed = {k: v for k, v in stats.items() if v > 0}
+            if changed:
+                await self._stats_repo.upsert_daily(date, user_id, **changed)
 
         # Channel stats
         ch_batch = self._channel_batch.copy()
         self._channel_batch.clear()
         for (date, channel_id, user_id), count in ch_batch.items():
-            for _ in range(count):
-                await self._stats_repo.increment_channel(date, channel_id, user_id)
+            await self._stats_repo.increment_channel(date, channel_id, user_id, count)
 
         # Word frequency
         word_batch = self._word_batch.copy()
@@ -237,6 +249,57 @@ class MonthlyStatsCog(commands.Cog, name="MonthlyStatsCog"):
             for date, mids in by_date_mentions.items():
                 await self._stats_repo.increment_mentions(date, mids)
 
+    # ── Rollup & Retention ────────────────────────
+
+    @tasks.loop(time=time(hour=4, tzinfo=timezone.utc))
+    async def retention_loop(self):
+        try:
+            await self._rollup_and_prune()
+        except Exception:
+            logger.exception("message_tracking rollup/retention failed")
+
+    @retention_loop.before_loop
+    async def before_retention(self):
+        await self.bot.wait_until_ready()
+
+    async def _rollup_and_prune(self) -> None:
+        """Roll every closed month into summary rows, then prune raw rows past retention."""
+        # Buffered rows go first, so the rollup counts every message of the month
+        await self._flush_batches()
+        config = self.bot.config.get("monthly_stats", {})
+        retention_days = config.get("tracking_retention_days", 90)
+        batch_size = config.get("retention_batch_size", 1000)
+
+        this_month = self._this_month()
+        month = await self._stats_repo.get_oldest_tracked_month()
+        while month and month < this_month:
+            if not await self._stats_repo.is_month_rolled_up(month):
+                rolled = await self._stats_repo.rollup_month(month)
+                logger.info("Rolled up %d tracked messages for %s", rolled, month)
+            dt = datetime.strptime(month, "%Y-%m")
+            month = f"{dt.year + 1}-01" if dt.month == 12 else f"{dt.year}-{dt.month + 1:02d}"
+
+        # Never prune the open month: it has no summary yet
+        cutoff = min(
+            (datetime.now(timezone.utc) - timedelta(days=retention_days)).strftime("%Y-%m-%d"),
+            this_month,
+        )
+        total = 0
+        while True:
+            deleted = await self._stats_repo.prune_tracked_messages(cutoff, batch_size)
+            total += deleted
+            if deleted < batch_size:
+                break
+            # Let queued writes in between batches
+            await asyncio.sleep(0.1)
+        if total:
+            logger.info("Pruned %d message_tracking rows older than %s", total, cutoff)
+
+        # Per-channel counts for rolled-up months are served from message_monthly_channels
+        channel_days = await self._stats_repo.prune_channel_stats(cutoff)
+        if channel_days:
+            logger.info("Pruned %d channel_stats rows older than %s", channel_days, cutoff)
+
     # ── Monthly Report Generation ─────────────────
 
     @tasks.loop(minutes=30)
@@ -263,6 +326,8 @@ class MonthlyStatsCog(commands.Cog, name="MonthlyStatsCog"):
 
     async def _generate_and_post_report(self, month: str) -> discord.Message | None:
         """Generate the monthly stats card and post it."""
+        # Buffered stats go first, so the report covers the month's last minute too
+        await self._flush_batches()
         # Gather all stats
         report_data: dict = {}
         stat_entries: list[MonthlyStatEntry] = []
@@ -33,7 +33,7 @@ class OnboardingCog(commands.Cog, name="OnboardingCog"):
         logger.info("New member joined: %s (%d)", member, member.id)
 
         # Ensure user exists in DB
-        user_repo = UserRepository(self.bot.db)
+        user_repo = UserRepository(self.bot.db, self.bot.user_cache, self.bot.rank_index)
         await user_repo.upsert(
             member.id,
             username=str(member),
@@ -1,8 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import csv
+import gzip
+import io
+import json
 import logging
 import random
-from typing import TYPE_CHECKING
+import re
+import shutil
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Callable, Iterator
 
 import discord
 from discord import app_commands
@@ -10,6 +22,7 @@ from discord.ext import commands, tasks
 
 from core.constants import XPSource
 from database.repositories.users import UserRepository
+from database.models import XPEntry
 from database.repositories.xp import XPRepository
 from services.card_renderer import RankCardData, LeaderboardEntry
 
@@ -19,31 +32,128 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+class _LRUDict(OrderedDict):
+    """OrderedDict that drops the least recently used key past ``max_size``."""
+
+    def __init__(self, max_size: int):
+        super().__init__()
+        self.max_size = max_size
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.max_size:
+            self.popitem(last=False)
+
+
+@dataclass(slots=True)
+class _PendingXP:
+    """A user's awards since the last flush, on top of their last known total."""
+    total: int
+    level: int
+    xp: int = 0
+    messages: int = 0
+    vc_minutes: int = 0
+    entries: list[tuple[int, int, str, str | None]] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class _VoiceSession:
+    """A member earning voice XP in one channel, credited up to ``since`` (monotonic)."""
+    channel_id: int
+    since: float
+
+
+@dataclass(slots=True)
+class _ReconcileReport:
+    """Users whose stored XP disagrees with their xp_history total."""
+    checked: int
+    # (user_id, stored_xp, history_xp, stored_level, history_level), largest drift first
+    drifted: list[tuple[int, int, int, int, int]]
+    applied: int
+    seconds: float
+
+    def summary(self, applied: bool, limit: int) -> str:
+        if not self.drifted:
+            return f"Checked **{self.checked:,}** users in {self.seconds:.1f}s: no drift."
+        absolute = sum(abs(history - stored) for _, stored, history, _, _ in self.drifted)
+        net = sum(history - stored for _, stored, history, _, _ in self.drifted)
+        levels = sum(old != new for *_, old, new in self.drifted)
+        lines = [
+            f"Checked **{self.checked:,}** users in {self.seconds:.1f}s: **{len(self.drifted):,}** drifted "
+            f"by {absolute:,} XP in total (net {net:+,}), {levels:,} with a different level.",
+            f"Fixed {self.applied:,}." if applied else "Dry run: nothing changed.",
+        ]
+        if applied and self.applied < len(self.drifted):
+            lines.append(f"{len(self.drifted) - self.applied:,} earned XP meanwhile and were left for the next run.")
+        for user_id, stored, history, old, new in self.drifted[:limit]:
+            lines.append(f"- <@{user_id}>: {stored:,} -> {history:,} XP (level {old} -> {new})")
+        return "\n".join(lines)
+
+
 class XPCog(commands.Cog, name="XPCog"):
     """Release 1.5A: XP tracking, levels, leaderboard."""
 
     def __init__(self, bot: GayborhoodBot):
         self.bot = bot
         self._xp_cooldowns: dict[int, float] = {}  # user_id -> last_xp_timestamp
-        self._user_repo = UserRepository(bot.db)
+        self._user_repo = UserRepository(bot.db, bot.user_cache, bot.rank_index)
         self._xp_repo = XPRepository(bot.db)
 
+        # Message and reaction awards are buffered per user and written by _flush_xp
+        self._pending: dict[int, _PendingXP] = {}
+        self._pending_entries = 0
+        self._flush_lock = asyncio.Lock()
+        self._reconcile_lock = asyncio.Lock()
+
+        # Reactions are resolved from memory: message_id -> author_id (None for bots) and
+        # message_id -> reaction XP awarded so far, so most reactions need no HTTP or SQL
+        cache_size = bot.config.xp.get("message_cache_size", 50_000)
+        self._message_authors: _LRUDict = _LRUDict(cache_size)
+        self._reaction_counts: _LRUDict = _LRUDict(cache_size)
+
+        # Voice sessions, opened and closed by on_voice_state_update
+        self._voice_sessions: dict[int, _VoiceSession] = {}
+        self._voice_seconds: dict[int, float] = {}  # user_id -> seconds short of a whole minute
+        self._voice_minutes: Counter[tuple[int, int]] = Counter()  # (user_id, channel_id) -> uncredited
+
     async def cog_load(self):
-        self.vc_xp_loop.start()
+        self.xp_flush_loop.change_interval(seconds=self.bot.config.xp.get("flush_interval_seconds", 10))
+        self.xp_flush_loop.start()
+        self.voice_checkpoint_loop.change_interval(
+            seconds=self.bot.config.xp.get("voice_check_interval_seconds", 60),
+        )
+        self.voice_checkpoint_loop.start()
+        if self.bot.config.xp.get("compaction", {}).get("enabled", True):
+            self.compaction_loop.start()
+        if self.bot.config.xp.get("reconciliation", {}).get("enabled", True):
+            self.reconcile_loop.start()
 
     async def cog_unload(self):
-        self.vc_xp_loop.cancel()
+        self.xp_flush_loop.cancel()
+        self.voice_checkpoint_loop.cancel()
+        self.compaction_loop.cancel()
+        self.reconcile_loop.cancel()
+        # Final flush, including voice time up to now
+        self._bank_all_voice()
+        await self._credit_voice()
+        await self._flush_xp()
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
-        if message.author.bot or not message.guild:
+        if not message.guild or message.guild.id != self.bot.config.guild_id:
             return
-        if message.guild.id != self.bot.config.guild_id:
+        self._message_authors[message.id] = None if message.author.bot else message.author.id
+        if message.author.bot:
             return
 
-        import time
         user_id = message.author.id
-        now = time.monotonic()
+        now = monotonic()
         cooldown = self.bot.config.xp.get("message_cooldown_seconds", 60)
 
         if user_id in self._xp_cooldowns:
@@ -56,8 +166,7 @@ class XPCog(commands.Cog, name="XPCog"):
         xp_max = self.bot.config.xp.get("message_max", 20)
         amount = random.randint(xp_min, xp_max)
 
-        await self._award_xp(user_id, amount, XPSource.MESSAGE, f"msg:{message.channel.id}")
-        await self._user_repo.increment_messages(user_id)
+        await self._queue_xp(user_id, amount, XPSource.MESSAGE, f"msg:{message.channel.id}", messages=1)
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
@@ -67,73 +176,382 @@ class XPCog(commands.Cog, name="XPCog"):
             return
 
         # Award XP to the message author, not the reactor
-        channel = self.bot.get_channel(payload.channel_id)
-        if not channel or not isinstance(channel, discord.TextChannel):
-            return
-
-        try:
-            message = await channel.fetch_message(payload.message_id)
-        except discord.NotFound:
-            return
+        if payload.message_id in self._message_authors:
+            author_id = self._message_authors[payload.message_id]
+        else:
+            # Sent before the bot started (or evicted from the cache): ask Discord once
+            channel = self.bot.get_channel(payload.channel_id)
+            if not channel or not isinstance(channel, discord.TextChannel):
+                return
+            try:
+                message = await channel.fetch_message(payload.message_id)
+            except discord.NotFound:
+                return
+            author_id = None if message.author.bot else message.author.id
+            self._message_authors[payload.message_id] = author_id
 
-        if message.author.bot or message.author.id == payload.user_id:
+        if author_id is None or author_id == payload.user_id:
             return
 
         # Check max reactions per message
         detail_key = f"reaction:{payload.message_id}"
         max_per_msg = self.bot.config.xp.get("reaction_max_per_message", 20)
-        count = await self._xp_repo.count_reactions_on_message(detail_key)
+        if payload.message_id in self._reaction_counts:
+            count = self._reaction_counts[payload.message_id]
+        else:
+            count = await self._xp_repo.count_reactions_on_message(detail_key)
+            # Another reaction may have seeded the counter while we waited
+            if payload.message_id in self._reaction_counts:
+                count = self._reaction_counts[payload.message_id]
         if count >= max_per_msg:
+            self._reaction_counts[payload.message_id] = count
             return
+        self._reaction_counts[payload.message_id] = count + 1
 
         reaction_xp = self.bot.config.xp.get("reaction_xp", 2)
-        await self._award_xp(message.author.id, reaction_xp, XPSource.REACTION, detail_key)
+        await self._queue_xp(author_id, reaction_xp, XPSource.REACTION, detail_key)
 
-    @tasks.loop(seconds=60)
-    async def vc_xp_loop(self):
-        """Award XP to non-muted users in voice channels."""
-        guild = self.bot.guild
-        if not guild:
+    # ── Voice Sessions ────────────────────────────
+
+    @staticmethod
+    def _earns_voice_xp(state: discord.VoiceState) -> bool:
+        return (
+            isinstance(state.channel, discord.VoiceChannel)
+            and not state.self_mute and not state.self_deaf
+        )
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: discord.Member,
+                                    before: discord.VoiceState, after: discord.VoiceState):
+        if member.bot or member.guild.id != self.bot.config.guild_id:
             return
 
+        session = self._voice_sessions.get(member.id)
+        earning = self._earns_voice_xp(after)
+        if session is not None and (not earning or after.channel.id != session.channel_id):
+            # Leave, channel switch, or mute/deafen: bank the time up to now
+            self._bank_voice(member.id, session, monotonic())
+            del self._voice_sessions[member.id]
+            session = None
+        if earning and session is None:
+            self._voice_sessions[member.id] = _VoiceSession(after.channel.id, monotonic())
+
+    def _bank_voice(self, user_id: int, session: _VoiceSession, now: float) -> None:
+        """Move a session's time up to ``now`` into whole uncredited minutes, carrying the remainder."""
+        seconds = self._voice_seconds.pop(user_id, 0.0) + now - session.since
+        session.since = now
+        minutes, rest = divmod(seconds, 60)
+        if rest:
+            self._voice_seconds[user_id] = rest
+        if minutes:
+            self._voice_minutes[(user_id, session.channel_id)] += int(minutes)
+
+    def _bank_all_voice(self) -> None:
+        now = monotonic()
+        for user_id, session in self._voice_sessions.items():
+            self._bank_voice(user_id, session, now)
+
+    async def _credit_voice(self) -> None:
+        """Queue banked minutes as XP; the next flush writes them with everything else pending."""
+        if not self._voice_minutes:
+            return
         xp_per_min = self.bot.config.xp.get("voice_per_minute", 5)
-
+        credits = list(self._voice_minutes.items())
+        self._voice_minutes.clear()
+        for (user_id, channel_id), minutes in credits:
+            await self._queue_xp(
+                user_id, minutes * xp_per_min, XPSource.VOICE, f"vc:{channel_id}", vc_minutes=minutes,
+            )
+
+    def _sync_voice_sessions(self) -> None:
+        """Match the open sessions to the guild's current voice states.
+
+        Voice events missed while the gateway reconnected would otherwise
+        leave a session open (crediting a member who left) or never open
+        one. A stale session is banked up to now and closed.
+        """
+        guild = self.bot.guild
+        if not guild:
+            return
+        now = monotonic()
+        for user_id, session in list(self._voice_sessions.items()):
+            member = guild.get_member(user_id)
+            state = member.voice if member else None
+            if state is None or not self._earns_voice_xp(state) or state.channel.id != session.channel_id:
+                self._bank_voice(user_id, session, now)
+                del self._voice_sessions[user_id]
         for vc in guild.voice_channels:
             for member in vc.members:
-                if member.bot:
-                    continue
-                if member.voice and (member.voice.self_mute or member.voice.self_deaf):
-                    continue
+                if not member.bot and member.voice and self._earns_voice_xp(member.voice):
+                    self._voice_sessions.setdefault(member.id, _VoiceSession(vc.id, now))
 
-                await self._award_xp(member.id, xp_per_min, XPSource.VOICE, f"vc:{vc.id}")
-                await self._user_repo.add_vc_minutes(member.id, 1)
+    @tasks.loop(seconds=60)
+    async def voice_checkpoint_loop(self):
+        """Credit ongoing sessions; with nobody in voice there is nothing to do."""
+        self._sync_voice_sessions()
+        if not self._voice_sessions and not self._voice_minutes:
+            return
+        self._bank_all_voice()
+        try:
+            await self._credit_voice()
+            await self._flush_xp()
+        except Exception:
+            logger.exception("Voice XP checkpoint failed")
 
-    @vc_xp_loop.before_loop
-    async def before_vc_xp(self):
+    @voice_checkpoint_loop.before_loop
+    async def before_voice_checkpoint(self):
         await self.bot.wait_until_ready()
+        # Members already in voice when the bot (re)started never sent a join event
+        self._sync_voice_sessions()
 
-    async def _award_xp(self, user_id: int, amount: int, source: str, details: str | None = None):
-        """Award XP, detect level-ups and milestones."""
-        # Ensure user exists
-        await self._user_repo.upsert(user_id)
-        await self._xp_repo.add(user_id, amount, source, details)
+    # ── History Compaction ────────────────────────
 
-        user = await self._user_repo.get(user_id)
-        if not user:
+    @tasks.loop(time=time(hour=4, minute=30, tzinfo=timezone.utc))
+    async def compaction_loop(self):
+        try:
+            await self._compact_history()
+        except Exception:
+            logger.exception("xp_history compaction failed")
+
+    @compaction_loop.before_loop
+    async def before_compaction(self):
+        await self.bot.wait_until_ready()
+
+    async def _compact_history(self) -> None:
+        """Compact whole days of xp_history older than ``after_days``, oldest first."""
+        config = self.bot.config.xp.get("compaction", {})
+        after_days = config.get("after_days", 90)
+        max_days = config.get("max_days_per_run", 30)
+        archive_dir = config.get("archive_dir")
+
+        cutoff = datetime.now(timezone.utc).date() - timedelta(days=after_days)
+        day = await self._xp_repo.get_next_compaction_day()
+        if archive_dir and day:
+            await asyncio.to_thread(_settle_staged_archives, Path(archive_dir), day)
+        raw_total = compacted_total = days = 0
+        while day and date.fromisoformat(day) < cutoff and days < max_days:
+            if archive_dir:
+                # The archive is written before the write lock is taken and only
+                # appended once the day's compaction commits, so a rollback
+                # leaves nothing behind to be archived twice
+                rows = await self._xp_repo.get_day(day)
+                path = Path(archive_dir) / f"xp_history-{day[:7]}.jsonl.gz"
+                staged = await asyncio.to_thread(_stage_archive, path, day, rows)
+                try:
+                    raw, compacted = await self._xp_repo.compact_day(day, rows)
+                except BaseException:
+                    if staged is not None:
+                        staged.unlink(missing_ok=True)
+                    raise
+                if staged is not None:
+                    await asyncio.to_thread(_append_staged, staged, path)
+            else:
+                raw, compacted = await self._xp_repo.compact_day(day)
+            raw_total += raw
+            compacted_total += compacted
+            days += 1
+            day = (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+        if days:
+            logger.info(
+                "Compacted %d days of xp_history: %d rows -> %d", days, raw_total, compacted_total,
+            )
+
+    # ── Reconciliation ────────────────────────────
+
+    @tasks.loop(time=time(hour=5, tzinfo=timezone.utc))
+    async def reconcile_loop(self):
+        config = self.bot.config.xp.get("reconciliation", {})
+        apply = config.get("apply", False)
+        try:
+            report = await self._reconcile_xp(apply)
+        except Exception:
+            logger.exception("XP reconciliation failed")
             return
+        if report.drifted:
+            logger.warning("XP reconciliation: %s", report.summary(apply, config.get("report_limit", 10)))
+        else:
+            logger.info("XP reconciliation: %d users checked, no drift", report.checked)
 
-        old_level = user.level
-        new_total = user.total_xp + amount
-        new_level = self.bot.xp_calculator.calculate_level(new_total)
+    @reconcile_loop.before_loop
+    async def before_reconcile(self):
+        await self.bot.wait_until_ready()
 
-        await self._user_repo.add_xp(user_id, amount, new_level)
+    async def _reconcile_xp(self, apply: bool) -> _ReconcileReport:
+        """Recompute every total from xp_history, diff it with users, and fix the drift in one batch."""
+        async with self._reconcile_lock:
+            started = monotonic()
+            # Buffered awards already count in neither table until flushed
+            await self._flush_xp()
+            rows = await self._xp_repo.get_history_totals()
+            histories = [max(0, history) for *_, history in rows]
+            levels = self.bot.xp_calculator.levels_for(histories)
+            drifted = sorted(
+                (
+                    (user_id, total, history, level, new_level)
+                    for (user_id, total, level, _), history, new_level in zip(rows, histories, levels)
+                    if total != history or level != new_level
+                ),
+                key=lambda d: abs(d[2] - d[1]), reverse=True,
+            )
+
+            applied = 0
+            if apply and drifted:
+                applied = await self._user_repo.reconcile_xp([
+                    (history, new_level, user_id, total)
+                    for user_id, total, history, _, new_level in drifted
+                ])
+                # In-memory totals were read before the fix: forget idle ones, re-base the rest
+                for user_id, _, history, _, _ in drifted:
+                    p = self._pending.get(user_id)
+                    if p is None:
+                        continue
+                    if not p.entries:
+                        del self._pending[user_id]
+                    else:
+                        p.total = history + p.xp
+                        p.level = self.bot.xp_calculator.calculate_level(p.total)
+            return _ReconcileReport(len(rows), drifted, applied, monotonic() - started)
+
+    # ── Awarding & Flushing ───────────────────────
+
+    @tasks.loop(seconds=10)
+    async def xp_flush_loop(self):
+        try:
+            await self._flush_xp()
+        except Exception:
+            logger.exception("XP flush failed; awards kept for the next attempt")
+
+    @xp_flush_loop.before_loop
+    async def before_xp_flush(self):
+        await self.bot.wait_until_ready()
+
+    async def _queue_xp(self, user_id: int, amount: int, source: str, details: str | None = None,
+                        messages: int = 0, vc_minutes: int = 0) -> None:
+        """Add XP in memory for the next flush; a level-up flushes at once, then fires its events."""
+        pending = self._pending.get(user_id)
+        if pending is None:
+            user = await self._user_repo.get(user_id)
+            # Another award may have started tracking this user while we waited
+            pending = self._pending.get(user_id)
+            if pending is None:
+                pending = _PendingXP(user.total_xp, user.level) if user else _PendingXP(0, 0)
+                self._pending[user_id] = pending
+
+        old_level = pending.level
+        new_level = self.bot.xp_calculator.calculate_level(pending.total + amount)
+        pending.total += amount
+        pending.level = new_level
+        pending.xp += amount
+        pending.messages += messages
+        pending.vc_minutes += vc_minutes
+        pending.entries.append((user_id, amount, source, details))
+        self._pending_entries += 1
 
         if new_level > old_level:
-            self.bot.dispatch("level_up", user_id, old_level, new_level)
+            # Listeners read the user row, so it has to be written before they run
+            await self._flush_xp()
+            self._dispatch_level_up(user_id, old_level, new_level)
+        elif self._pending_entries >= self.bot.config.xp.get("flush_max_pending", 500):
+            await self._flush_xp()
+
+    async def _flush_xp(self) -> None:
+        """Write buffered awards: one users upsert per user and one xp_history batch, in one transaction."""
+        async with self._flush_lock:
+            batch = [
+                (user_id, p.total, p.xp, p.level, p.messages, p.vc_minutes, p.entries)
+                for user_id, p in self._pending.items() if p.entries
+            ]
+            # Users with nothing new since the last flush are forgotten; their next award re-reads the row
+            self._pending = {user_id: p for user_id, p in self._pending.items() if p.entries}
+            for p in self._pending.values():
+                p.xp = p.messages = p.vc_minutes = 0
+                p.entries = []
+            self._pending_entries = 0
+            if not batch:
+                return
 
-            milestones = self.bot.xp_calculator.check_milestones(old_level, new_level)
-            for milestone in milestones:
-                self.bot.dispatch("milestone_reached", user_id, milestone)
+            try:
+                async with self.bot.db.transaction():
+                    await self._user_repo.apply_xp_batch([
+                        (user_id, xp, level, messages, vc_minutes)
+                        for user_id, _, xp, level, messages, vc_minutes, _ in batch
+                    ])
+                    await self._xp_repo.bulk_import([e for *_, entries in batch for e in entries])
+                    # Other writers (achievements, staff, monthly awards) may have moved these
+                    # totals. Re-read them in the same transaction, where no other write can land
+                    # in between, and repair any stale level along with the batch
+                    users = await self._user_repo.get_many([row[0] for row in batch])
+                    levels = self.bot.xp_calculator.levels_for(u.total_xp for u in users)
+                    fixes = [(level, u.user_id) for u, level in zip(users, levels) if level != u.level]
+                    if fixes:
+                        await self._user_repo.set_levels(fixes)
+            except BaseException:
+                # Put the awards back so the next flush (or the shutdown flush) retries them.
+                # The rank index and user cache only change once the batch commits, so the
+                # rolled-back attempt left nothing behind for the retry to double-count.
+                for user_id, total, xp, level, messages, vc_minutes, entries in batch:
+                    p = self._pending.setdefault(user_id, _PendingXP(total, level))
+                    p.xp += xp
+                    p.messages += messages
+                    p.vc_minutes += vc_minutes
+                    p.entries[:0] = entries
+                    self._pending_entries += len(entries)
+                raise
+
+            # Re-base the in-memory totals on the rows as committed
+            for u, level in zip(users, levels):
+                p = self._pending.get(u.user_id)
+                if p is not None:
+                    p.total = u.total_xp + p.xp
+                    p.level = max(p.level, level)
+
+    async def _award_xp(self, user_id: int, amount: int, source: str, details: str | None = None):
+        """Award XP straight to the database (staff bonuses), detect level-ups and milestones."""
+        # Buffered awards go first, so the total read below is current
+        await self._flush_xp()
+        self._pending.pop(user_id, None)
+
+        async with self.bot.db.transaction():
+            # Ensure user exists
+            await self._user_repo.upsert(user_id)
+            await self._xp_repo.add(user_id, amount, source, details)
+
+            user = await self._user_repo.get(user_id)
+            if not user:
+                return
+
+            old_level = user.level
+            new_total = user.total_xp + amount
+            new_level = self.bot.xp_calculator.calculate_level(new_total)
+
+            await self._user_repo.add_xp(user_id, amount, new_level)
+
+        # Events fire only once the award is committed
+        if new_level > old_level:
+            self._dispatch_level_up(user_id, old_level, new_level)
+
+    async def _set_total(self, user_id: int, new_total: Callable[[int], int],
+                         source: str, details: str) -> int:
+        """Overwrite a user's total, logging the difference to xp_history so it still adds up; returns the level."""
+        await self._flush_xp()
+        self._pending.pop(user_id, None)
+
+        async with self.bot.db.transaction():
+            user = await self._user_repo.get(user_id)
+            old_total = user.total_xp if user else 0
+            total = new_total(old_total)
+            level = self.bot.xp_calculator.calculate_level(total)
+            if total != old_total:
+                await self._xp_repo.add(user_id, total - old_total, source, details)
+            await self._user_repo.set_xp(user_id, total, level)
+        return level
+
+    def _dispatch_level_up(self, user_id: int, old_level: int, new_level: int) -> None:
+        self.bot.dispatch("level_up", user_id, old_level, new_level)
+
+        milestones = self.bot.xp_calculator.check_milestones(old_level, new_level)
+        for milestone in milestones:
+            self.bot.dispatch("milestone_reached", user_id, milestone)
 
     # ── Slash Commands ────────────────────────
 
@@ -234,12 +652,9 @@ class XPCog(commands.Cog, name="XPCog"):
     @app_commands.checks.has_permissions(manage_roles=True)
     async def xp_take(self, interaction: discord.Interaction, member: discord.Member,
                       amount: app_commands.Range[int, 1, 10000], reason: str = "Staff penalty"):
-        await self._xp_repo.add(member.id, -amount, XPSource.PENALTY, reason)
         user = await self._user_repo.get(member.id)
         if user:
-            new_total = max(0, user.total_xp - amount)
-            new_level = self.bot.xp_calculator.calculate_level(new_total)
-            await self._user_repo.set_xp(member.id, new_total, new_level)
+            await self._set_total(member.id, lambda total: max(0, total - amount), XPSource.PENALTY, reason)
 
         await self.bot.audit_logger.log(
             "xp_take", actor_id=interaction.user.id, target_id=member.id,
@@ -255,9 +670,8 @@ class XPCog(commands.Cog, name="XPCog"):
     @app_commands.checks.has_permissions(administrator=True)
     async def xp_set(self, interaction: discord.Interaction, member: discord.Member,
                      total_xp: app_commands.Range[int, 0, 1000000]):
-        new_level = self.bot.xp_calculator.calculate_level(total_xp)
         await self._user_repo.upsert(member.id)
-        await self._user_repo.set_xp(member.id, total_xp, new_level)
+        new_level = await self._set_total(member.id, lambda _: total_xp, XPSource.ADJUST, "xp-set")
 
         await self.bot.audit_logger.log(
             "xp_set", actor_id=interaction.user.id, target_id=member.id,
@@ -272,7 +686,7 @@ class XPCog(commands.Cog, name="XPCog"):
     @app_commands.describe(member="Target member")
     @app_commands.checks.has_permissions(administrator=True)
     async def xp_reset(self, interaction: discord.Interaction, member: discord.Member):
-        await self._user_repo.set_xp(member.id, 0, 0)
+        await self._set_total(member.id, lambda _: 0, XPSource.ADJUST, "xp-reset")
         await self.bot.audit_logger.log(
             "xp_reset", actor_id=interaction.user.id, target_id=member.id,
         )
@@ -281,47 +695,193 @@ class XPCog(commands.Cog, name="XPCog"):
         )
 
     @app_commands.command(name="xp-import", description="Bulk import XP levels from attachment (Staff)")
-    @app_commands.describe(file="CSV or JSON file with user_id and level columns")
+    @app_commands.describe(
+        file="CSV or JSON file with user_id and level columns",
+        dry_run="Only report what would change",
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    async def xp_import(self, interaction: discord.Interaction, file: discord.Attachment,
+                        dry_run: bool = False):
+        await interaction.response.defer(ephemeral=True)
+        started = monotonic()
+        batch_size = self.bot.config.xp.get("import_batch_size", 2000)
+        verb = "Checked" if dry_run else "Imported"
+
+        data = await file.read()
+        rows = _iter_import_rows(file.filename, data)
+        progress = await interaction.followup.send(f"{verb} 0 rows...", ephemeral=True, wait=True)
+        last_progress = monotonic()
+
+        if not dry_run:
+            # Buffered awards go in first; the import overwrites totals after them
+            await self._flush_xp()
+            self._pending.clear()
+
+        total = new = changed = unchanged = level_changes = 0
+        errors: list[str] = []
+        for batch in _import_batches(rows, batch_size, errors):
+            xps = [self.bot.xp_calculator.xp_for_import_level(level) for _, level in batch]
+            # Stored levels come from the XP, like every other write, not from the file
+            levels = self.bot.xp_calculator.levels_for(xps)
+            existing = await self._user_repo.get_xp_many([uid for uid, _ in batch])
+            history = []
+            for (uid, _), xp, level in zip(batch, xps, levels):
+                before = existing.get(uid)
+                if before is None:
+                    new += 1
+                elif before[0] == xp:
+                    unchanged += 1
+                else:
+                    changed += 1
+                    level_changes += before[1] != level
+                # History gets the difference, so it keeps adding up to the imported total
+                previous = before[0] if before else 0
+                if xp != previous:
+                    history.append((uid, xp - previous, XPSource.IMPORT, f"Imported level {level}"))
+                existing[uid] = (xp, level)
+            if not dry_run:
+                async with self.bot.db.transaction():
+                    # Users first so the xp_history foreign keys resolve
+                    await self._user_repo.bulk_set_xp([
+                        (uid, xp, level) for (uid, _), xp, level in zip(batch, xps, levels)
+                    ])
+                    await self._xp_repo.bulk_import(history)
+            total += len(batch)
+
+            if monotonic() - last_progress >= 2:
+                last_progress = monotonic()
+                await progress.edit(content=f"{verb} {total:,} rows...")
+
+        elapsed = monotonic() - started
+        rate = total / elapsed if elapsed else 0
+        summary = (
+            f"{'Dry run: ' if dry_run else ''}{verb} **{total:,}** rows in {elapsed:.1f}s "
+            f"({rate:,.0f} rows/s).\n"
+            f"{'Would create' if dry_run else 'Created'} {new:,}, "
+            f"{'would change' if dry_run else 'changed'} {changed:,} "
+            f"({level_changes:,} with a different level), {unchanged:,} already matched."
+        )
+        if errors:
+            summary += f"\nSkipped {len(errors):,} invalid row(s):\n" + "\n".join(f"- {e}" for e in errors[:5])
+        await progress.edit(content=summary[:2000])
+
+        if not dry_run:
+            await self.bot.audit_logger.log(
+                "xp_import", actor_id=interaction.user.id,
+                details=f"{total} rows from {file.filename} ({new} new, {changed} changed)",
+            )
+
+    @app_commands.command(name="xp-reconcile", description="Rebuild XP totals from XP history (Staff)")
+    @app_commands.describe(dry_run="Only report the drift, change nothing")
     @app_commands.checks.has_permissions(administrator=True)
-    async def xp_import(self, interaction: discord.Interaction, file: discord.Attachment):
+    async def xp_reconcile(self, interaction: discord.Interaction, dry_run: bool = False):
         await interaction.response.defer(ephemeral=True)
+        report = await self._reconcile_xp(apply=not dry_run)
+        limit = self.bot.config.xp.get("reconciliation", {}).get("report_limit", 10)
+        await interaction.followup.send(report.summary(not dry_run, limit)[:2000], ephemeral=True)
 
-        content = (await file.read()).decode("utf-8")
-        entries = []
+        if not dry_run:
+            await self.bot.audit_logger.log(
+                "xp_reconcile", actor_id=interaction.user.id,
+                details=f"{report.checked} users checked, {len(report.drifted)} drifted, {report.applied} fixed",
+            )
+
+
+_JSON_WS = re.compile(r"\s*")
+
+# Far above any real level, and low enough that the XP for it fits a 64-bit column
+_MAX_IMPORT_LEVEL = 10_000
 
-        if file.filename.endswith(".json"):
-            import json
-            data = json.loads(content)
-            for item in data:
-                uid = int(item["user_id"])
-                level = int(item["level"])
-                xp = self.bot.xp_calculator.xp_for_import_level(level)
-                entries.append((uid, xp, XPSource.IMPORT, f"Imported level {level}"))
+
+def _iter_json_array(text: str) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array one at a time."""
+    decoder = json.JSONDecoder()
+    pos = _JSON_WS.match(text).end()
+    if text[pos:pos + 1] != "[":
+        raise ValueError("JSON import must be an array of objects")
+    pos = _JSON_WS.match(text, pos + 1).end()
+    if text[pos:pos + 1] == "]":
+        return
+    while True:
+        try:
+            item, pos = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON at character {e.pos}: {e.msg}") from None
+        yield item
+        pos = _JSON_WS.match(text, pos).end()
+        if text[pos:pos + 1] == ",":
+            pos = _JSON_WS.match(text, pos + 1).end()
+        elif text[pos:pos + 1] == "]":
+            return
         else:
-            # CSV: user_id,level
-            import csv
-            import io
-            reader = csv.DictReader(io.StringIO(content))
-            for row in reader:
-                uid = int(row["user_id"])
-                level = int(row["level"])
-                xp = self.bot.xp_calculator.xp_for_import_level(level)
-                entries.append((uid, xp, XPSource.IMPORT, f"Imported level {level}"))
-
-        # Process entries
-        count = 0
-        for uid, xp, source, details in entries:
-            await self._user_repo.upsert(uid)
-            await self._xp_repo.add(uid, xp, source, details)
-            new_level = self.bot.xp_calculator.calculate_level(xp)
-            await self._user_repo.set_xp(uid, xp, new_level)
-            count += 1
+            raise ValueError(f"Invalid JSON at character {pos}: expected ',' or ']'")
 
-        await self.bot.audit_logger.log(
-            "xp_import", actor_id=interaction.user.id,
-            details={"count": count, "file": file.filename},
-        )
-        await interaction.followup.send(f"Imported XP for **{count}** users.", ephemeral=True)
+
+def _iter_import_rows(filename: str, data: bytes) -> Iterator[tuple[int, int] | str]:
+    """Parse an import file lazily into (user_id, level); unusable rows come back as an error string."""
+    if filename.endswith(".json"):
+        items: Iterator[Any] = _iter_json_array(data.decode("utf-8-sig"))
+    else:
+        # CSV: user_id,level
+        items = csv.DictReader(io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig", newline=""))
+    for n, item in enumerate(items, start=1):
+        try:
+            user_id, level = int(item["user_id"]), int(item["level"])
+        except (KeyError, TypeError, ValueError):
+            yield f"row {n}: {str(item)[:80]}"
+            continue
+        if not 0 <= level <= _MAX_IMPORT_LEVEL:
+            yield f"row {n}: level {level} out of range (0-{_MAX_IMPORT_LEVEL})"
+            continue
+        yield user_id, level
+
+
+def _import_batches(rows: Iterator[tuple[int, int] | str], size: int,
+                    errors: list[str]) -> Iterator[list[tuple[int, int]]]:
+    """Group parsed rows into batches, collecting bad rows (and a malformed file's error) in ``errors``."""
+    batch: list[tuple[int, int]] = []
+    try:
+        for row in rows:
+            if isinstance(row, str):
+                errors.append(row)
+                continue
+            batch.append(row)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    except ValueError as e:
+        errors.append(str(e))
+    if batch:
+        yield batch
+
+
+def _stage_archive(path: Path, day: str, rows: list[XPEntry]) -> Path | None:
+    """Write one day's raw rows as a gzip member next to the month's archive; None if no rows."""
+    if not rows:
+        return None
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staged = path.with_name(f"{path.name}.{day}.part")
+    lines = "".join(json.dumps(asdict(r)) + "\n" for r in rows)
+    with gzip.open(staged, "wt", encoding="utf-8") as f:
+        f.write(lines)
+    return staged
+
+
+def _append_staged(staged: Path, path: Path) -> None:
+    """Append a staged gzip member to the archive (concatenated members are one valid gzip file)."""
+    with open(path, "ab") as out, open(staged, "rb") as member:
+        shutil.copyfileobj(member, out)
+    staged.unlink()
+
+
+def _settle_staged_archives(archive_dir: Path, next_day: str) -> None:
+    """Finish staged archives a crash left behind: append days that were compacted, drop the rest."""
+    for staged in sorted(archive_dir.glob("xp_history-*.jsonl.gz.*.part")):
+        archive_name, day, _ = staged.name.rsplit(".", 2)
+        if day < next_day:
+            _append_staged(staged, staged.with_name(archive_name))
+        else:
+            staged.unlink()
 
 
 async def setup(bot: GayborhoodBot):
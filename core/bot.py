@@ -39,6 +39,8 @@ class GayborhoodBot(commands.Bot):
 
         # Services — populated in setup_hook
         self.db: Any = None
+        self.user_cache: Any = None
+        self.rank_index: Any = None
         self.dm_service: Any = None
         self.role_service: Any = None
         self.embed_builder: Any = None
@@ -49,6 +51,8 @@ class GayborhoodBot(commands.Bot):
         self.welcome_generator: Any = None
         self.xp_calculator: Any = None
         self.card_renderer: Any = None
+        self.db_maintenance: Any = None
+        self.backup_service: Any = None
 
     @property
     def uptime(self) -> float:
@@ -63,11 +67,22 @@ class GayborhoodBot(commands.Bot):
 
         # 1. Database
         from database.engine import create_engine
+        from database.instrumentation import InstrumentedEngine
         from database.migrations.migrate import run_migrations
+        from database.repositories.users import RankIndex, UserCache, UserRepository
 
-        self.db = await create_engine(self.config.database_url)
+        self.db = InstrumentedEngine(
+            await create_engine(
+                self.config.database_url,
+                sqlite_pragmas=self.config.database.get("sqlite_pragmas"),
+            ),
+            slow_query_ms=self.config.database.get("slow_query_ms", 250),
+        )
         await run_migrations(self.db)
-        logger.info("Database ready")
+        self.user_cache = UserCache(self.config.database.get("user_cache", {}))
+        self.rank_index = RankIndex()
+        ranked = await UserRepository(self.db, self.user_cache, self.rank_index).load_rank_index()
+        logger.info("Database ready (%d ranked users)", ranked)
 
         # 2. Services
         from services.audit_logger import AuditLogger
@@ -80,6 +95,8 @@ class GayborhoodBot(commands.Bot):
         from services.welcome_generator import WelcomeGenerator
         from services.xp_calculator import XPCalculator
         from services.card_renderer import CardRenderer
+        from services.db_maintenance import DatabaseMaintenance
+        from services.backup_service import BackupService
 
         self.audit_logger = AuditLogger(self.db)
         self.embed_builder = EmbedBuilder(self.config)
@@ -91,6 +108,8 @@ class GayborhoodBot(commands.Bot):
         self.xp_calculator = XPCalculator(self.config)
         self.card_renderer = CardRenderer()
         self.timer_service = TimerService(self, self.db, self.audit_logger)
+        self.db_maintenance = DatabaseMaintenance(self.db, self.config.database.get("maintenance", {}))
+        self.backup_service = BackupService(self.db, self.config.database.get("backup", {}))
         logger.info("Services initialized")
 
         # 3. Persistent views
@@ -119,9 +138,11 @@ class GayborhoodBot(commands.Bot):
             except Exception:
                 logger.exception("Failed to load cog: %s", cog_path)
 
-        # 5. Timer polling
+        # 5. Timer polling and database housekeeping
         self.timer_service.start_polling()
         logger.info("Timer polling started")
+        self.db_maintenance.start()
+        self.backup_service.start()
 
         # 6. Sync commands to guild
         guild = discord.Object(id=self.config.guild_id)
@@ -138,6 +159,12 @@ class GayborhoodBot(commands.Bot):
         logger.info("Shutting down...")
         if self.timer_service:
             self.timer_service.stop_polling()
+        if self.db_maintenance:
+            self.db_maintenance.stop()
+        if self.backup_service:
+            self.backup_service.stop()
+        # commands.Bot.close() unloads every extension; cogs flush their buffered
+        # writes in cog_unload, so the database has to stay open until after it
+        await super().close()
         if self.db:
             await self.db.close()
-        await super().close()
@@ -123,3 +123,7 @@ class Config:
     @property
     def rate_limits(self) -> dict[str, Any]:
         return self._data.get("rate_limits", {})
+
+    @property
+    def database(self) -> dict[str, Any]:
+        return self._data.get("database", {})
@@ -55,6 +55,7 @@ class XPSource(str, Enum):
     BONUS = "bonus"
     PENALTY = "penalty"
     IMPORT = "import"
+    ADJUST = "adjust"
 
 
 class TimerType(str, Enum):
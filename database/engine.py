@@ -1,12 +1,38 @@
 from __future__ import annotations
 
+import asyncio
+import dataclasses
+import functools
 import logging
-import re
+import operator
+import os
+import sqlite3
+import time
 from abc import ABC, abstractmethod
-from typing import Any
+from collections import OrderedDict
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from pathlib import Path
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Iterable, Sequence, TypeVar
+from urllib.parse import parse_qsl, urlencode
 
 logger = logging.getLogger(__name__)
 
+M = TypeVar("M")
+
+# Rows per executemany() when SQLite emulates bulk_copy()
+_COPY_BATCH_SIZE = 5000
+
+# PRAGMAs accepted in a SQLite performance profile, with their allowed keyword values
+# (None = any integer)
+_SQLITE_PRAGMAS: dict[str, frozenset[str] | None] = {
+    "synchronous": frozenset({"OFF", "NORMAL", "FULL", "EXTRA"}),
+    "temp_store": frozenset({"DEFAULT", "FILE", "MEMORY"}),
+    "auto_vacuum": frozenset({"NONE", "FULL", "INCREMENTAL"}),
+    "cache_size": None,
+    "mmap_size": None,
+}
+
 
 class DatabaseEngine(ABC):
     """Abstract database interface — swap between SQLite and PostgreSQL."""
@@ -15,6 +41,24 @@ class DatabaseEngine(ABC):
     async def execute(self, query: str, params: tuple = ()) -> None:
         ...
 
+    @abstractmethod
+    async def execute_many(self, query: str, rows: list[tuple]) -> None:
+        """Run one statement against every row in a single transaction."""
+        ...
+
+    @abstractmethod
+    async def bulk_copy(self, table: str, columns: Sequence[str], records: Iterable[tuple]) -> int:
+        """Append ``records`` to ``table`` as fast as the backend allows; returns the row count.
+
+        Plain inserts only — no conflict handling, no RETURNING. Wrap the call
+        in ``transaction()`` when the whole load must be all-or-nothing.
+        """
+        ...
+
+    async def insert_returning(self, query: str, params: tuple = ()) -> int:
+        """Run an INSERT and return the new row's id in the same round-trip."""
+        return await self.fetch_val(f"{query.rstrip()} RETURNING id", params)
+
     @abstractmethod
     async def fetch_one(self, query: str, params: tuple = ()) -> dict[str, Any] | None:
         ...
@@ -27,6 +71,38 @@ class DatabaseEngine(ABC):
     async def fetch_val(self, query: str, params: tuple = ()) -> Any:
         ...
 
+    @abstractmethod
+    async def fetch_model(self, query: str, params: tuple, model: type[M]) -> M | None:
+        """Fetch one row straight into ``model`` without an intermediate dict."""
+        ...
+
+    @abstractmethod
+    async def fetch_models(self, query: str, params: tuple, model: type[M]) -> list[M]:
+        """Fetch all rows straight into ``model`` instances."""
+        ...
+
+    @abstractmethod
+    def transaction(self) -> AbstractAsyncContextManager[None]:
+        """``async with db.transaction():`` — commit on success, roll back on error."""
+        ...
+
+    @abstractmethod
+    def in_transaction(self) -> bool:
+        """Whether the current task is inside ``transaction()``."""
+        ...
+
+    @abstractmethod
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` once the current task's transaction commits.
+
+        Outside a transaction it runs once the task's earlier writes are
+        committed, which is straight away unless the engine is holding them
+        for a group commit. Callbacks registered inside a block that rolls
+        back (including a nested savepoint) are dropped. For keeping
+        in-memory state in step with what others can read.
+        """
+        ...
+
     @abstractmethod
     async def execute_script(self, script: str) -> None:
         ...
@@ -35,105 +111,631 @@ class DatabaseEngine(ABC):
     async def close(self) -> None:
         ...
 
+    async def flush(self) -> None:
+        """Durability barrier: commit any writes the engine is still holding back.
+
+        Engines that commit every statement have nothing to do here.
+        """
 
-class SQLiteEngine(DatabaseEngine):
-    """SQLite engine using aiosqlite."""
 
-    def __init__(self, db_path: str):
+class SQLiteEngine(DatabaseEngine):
+    """SQLite engine using aiosqlite.
+
+    With ``write_behind`` enabled, writes run immediately inside an open
+    transaction but the commit (and its fsync) is deferred until either
+    ``commit_batch`` statements have piled up or ``commit_interval_ms`` has
+    passed. Reads share the connection, so they always see pending writes;
+    call ``flush()`` when a write has to be on disk before carrying on.
+
+    Writes are serialised by a lock so an explicit ``transaction()`` owns the
+    connection until it finishes; other tasks' writes wait rather than
+    leaking into it.
+
+    All writes go through one dedicated writer connection. Reads are served
+    from a small pool of read-only connections (WAL lets them run alongside
+    the writer), except inside the caller's own transaction or while a group
+    commit is pending — then they use the writer so they see those writes.
+
+    ``pragmas`` is a performance profile (synchronous, cache_size, mmap_size,
+    temp_store, auto_vacuum) applied to every connection on connect. The
+    checkpoint/optimize/vacuum helpers are driven by DatabaseMaintenance.
+    """
+
+    def __init__(self, db_path: str, write_behind: bool = False,
+                 commit_interval_ms: int = 50, commit_batch: int = 200,
+                 read_connections: int = 2, pragmas: dict[str, Any] | None = None):
         self._db_path = db_path
+        self._pragmas = _validate_pragmas(pragmas or {})
+        self._last_write = time.monotonic()
         self._conn = None
+        self._read_connections = 0 if db_path == ":memory:" else read_connections
+        self._readers: asyncio.Queue | None = None
+        self._write_behind = write_behind
+        self._commit_interval = commit_interval_ms / 1000
+        self._commit_batch = commit_batch
+        self._pending = 0
+        self._commit_task: asyncio.Task | None = None
+        self._write_lock = asyncio.Lock()
+        self._tx_owner: asyncio.Task | None = None
+        self._tx_depth = 0
+        self._on_commit: list[Callable[[], None]] = []
+        # after_commit callbacks waiting for the next group commit
+        self._on_flush: list[Callable[[], None]] = []
 
     async def connect(self) -> None:
         import aiosqlite
         self._conn = await aiosqlite.connect(self._db_path)
         self._conn.row_factory = aiosqlite.Row
+        # auto_vacuum only sticks before the first table exists (or after a VACUUM)
+        if "auto_vacuum" in self._pragmas:
+            await self._conn.execute(f"PRAGMA auto_vacuum={self._pragmas['auto_vacuum']}")
         await self._conn.execute("PRAGMA journal_mode=WAL")
         await self._conn.execute("PRAGMA foreign_keys=ON")
-        logger.info("SQLite connected: %s", self._db_path)
+        await self._apply_pragmas(self._conn)
+
+        if self._read_connections > 0:
+            read_uri = f"{Path(self._db_path).resolve().as_uri()}?mode=ro"
+            self._readers = asyncio.Queue()
+            for _ in range(self._read_connections):
+                reader = await aiosqlite.connect(read_uri, uri=True)
+                reader.row_factory = aiosqlite.Row
+                await self._apply_pragmas(reader)
+                self._readers.put_nowait(reader)
+
+        logger.info(
+            "SQLite connected: %s (write-behind: %s, readers: %d)",
+            self._db_path, "on" if self._write_behind else "off", self._read_connections,
+        )
+
+    async def _apply_pragmas(self, conn: Any) -> None:
+        for name, value in self._pragmas.items():
+            if name != "auto_vacuum":
+                await conn.execute(f"PRAGMA {name}={value}")
+
+    def _in_transaction(self) -> bool:
+        return self._tx_owner is not None and self._tx_owner is asyncio.current_task()
+
+    def in_transaction(self) -> bool:
+        return self._in_transaction()
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        if self._in_transaction():
+            self._on_commit.append(callback)
+        elif self._pending:
+            self._on_flush.append(callback)
+        else:
+            callback()
+
+    @asynccontextmanager
+    async def _connection_for(self, query: str) -> AsyncIterator[Any]:
+        """Connection to run a fetch on.
+
+        Writes with RETURNING go to the writer under the write lock and are
+        committed like ``execute``. Plain reads get a pooled read-only
+        connection, or the writer when it holds writes they must see.
+        """
+        if _is_write(query):
+            if self._in_transaction():
+                yield self._conn
+                return
+            async with self._write_lock:
+                yield self._conn
+                await self._after_write(1)
+            return
+
+        if self._in_transaction():
+            yield self._conn
+            return
+        if self._readers is None or self._pending:
+            # Wait out any other task's open transaction instead of reading its uncommitted rows
+            async with self._write_lock:
+                yield self._conn
+            return
+        reader = await self._readers.get()
+        try:
+            yield reader
+        finally:
+            self._readers.put_nowait(reader)
 
     async def execute(self, query: str, params: tuple = ()) -> None:
-        async with self._conn.execute(query, params):
+        if self._in_transaction():
+            async with self._conn.execute(query, params):
+                return
+        async with self._write_lock:
+            async with self._conn.execute(query, params):
+                pass
+            await self._after_write(1)
+
+    async def execute_many(self, query: str, rows: list[tuple]) -> None:
+        if not rows:
+            return
+        if self._in_transaction():
+            async with self._conn.executemany(query, rows):
+                return
+        async with self._write_lock:
+            async with self._conn.executemany(query, rows):
+                pass
+            await self._after_write(len(rows))
+
+    async def bulk_copy(self, table: str, columns: Sequence[str], records: Iterable[tuple]) -> int:
+        """Batched executemany; the write lock is released between batches."""
+        query = (
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))})"
+        )
+        records = iter(records)
+        copied = 0
+        while batch := list(islice(records, _COPY_BATCH_SIZE)):
+            await self.execute_many(query, batch)
+            copied += len(batch)
+        return copied
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """Group writes into one atomic unit; rolled back if the block raises.
+
+        Nested calls from the same task become savepoints. The commit honours
+        write-behind mode, so it may still be grouped with other writes.
+        """
+        if self._in_transaction():
+            async with self._savepoint():
+                yield
+            return
+
+        async with self._write_lock:
+            self._tx_owner = asyncio.current_task()
+            began = False
+            try:
+                if not self._conn.in_transaction:
+                    await self._conn.execute("BEGIN")
+                    began = True
+                async with self._savepoint():
+                    yield
+            except BaseException:
+                # The savepoint is already undone; end the BEGIN we opened so the
+                # writer does not hold its lock until some later commit. Writes
+                # queued before it (write-behind) stay for their group commit.
+                if began:
+                    await self._conn.rollback()
+                raise
+            finally:
+                self._tx_owner = None
+                callbacks, self._on_commit = self._on_commit, []
+            await self._after_write(1)
+            if self._pending:
+                # Held back for the group commit; _commit() runs them
+                self._on_flush.extend(callbacks)
+                callbacks = []
+        for callback in callbacks:
+            callback()
+
+    @asynccontextmanager
+    async def _savepoint(self) -> AsyncIterator[None]:
+        self._tx_depth += 1
+        name = f"sp_{self._tx_depth}"
+        mark = len(self._on_commit)
+        await self._conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield
+        except BaseException:
+            del self._on_commit[mark:]
+            await self._conn.execute(f"ROLLBACK TO {name}")
+            await self._conn.execute(f"RELEASE {name}")
+            raise
+        else:
+            await self._conn.execute(f"RELEASE {name}")
+        finally:
+            self._tx_depth -= 1
+
+    async def _after_write(self, statements: int) -> None:
+        """Commit now, or count the statements towards the next group commit."""
+        self._last_write = time.monotonic()
+        if not self._write_behind:
             await self._conn.commit()
+            return
+        self._pending += statements
+        if self._pending >= self._commit_batch:
+            await self._commit()
+        elif self._commit_task is None:
+            self._commit_task = asyncio.create_task(self._commit_later())
+
+    async def _commit_later(self) -> None:
+        try:
+            await asyncio.sleep(self._commit_interval)
+            self._commit_task = None
+            await self.flush()
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            logger.exception("Group commit failed")
+
+    async def _commit(self) -> None:
+        if self._commit_task is not None and self._commit_task is not asyncio.current_task():
+            self._commit_task.cancel()
+        self._commit_task = None
+        if self._pending == 0:
+            return
+        # _pending stays set until the commit lands: reads keep using the
+        # writer instead of a reader snapshot that lacks the batch
+        await self._conn.commit()
+        batch, self._pending = self._pending, 0
+        callbacks, self._on_flush = self._on_flush, []
+        logger.debug("Group commit: %d statements", batch)
+        for callback in callbacks:
+            callback()
+
+    async def flush(self) -> None:
+        """Commit every write queued so far in one transaction."""
+        if self._in_transaction():
+            return
+        async with self._write_lock:
+            await self._commit()
 
     async def fetch_one(self, query: str, params: tuple = ()) -> dict[str, Any] | None:
-        async with self._conn.execute(query, params) as cursor:
+        async with self._connection_for(query) as conn, conn.execute(query, params) as cursor:
             row = await cursor.fetchone()
             if row is None:
                 return None
             return dict(row)
 
     async def fetch_all(self, query: str, params: tuple = ()) -> list[dict[str, Any]]:
-        async with self._conn.execute(query, params) as cursor:
+        async with self._connection_for(query) as conn, conn.execute(query, params) as cursor:
             rows = await cursor.fetchall()
             return [dict(r) for r in rows]
 
     async def fetch_val(self, query: str, params: tuple = ()) -> Any:
-        async with self._conn.execute(query, params) as cursor:
+        async with self._connection_for(query) as conn, conn.execute(query, params) as cursor:
             row = await cursor.fetchone()
             if row is None:
                 return None
             return row[0]
 
+    async def fetch_model(self, query: str, params: tuple, model: type[M]) -> M | None:
+        async with self._connection_for(query) as conn, conn.execute(query, params) as cursor:
+            cursor.row_factory = None
+            row = await cursor.fetchone()
+            if row is None:
+                return None
+            return _row_decoder(model, _column_names(cursor.description))(row)
+
+    async def fetch_models(self, query: str, params: tuple, model: type[M]) -> list[M]:
+        async with self._connection_for(query) as conn, conn.execute(query, params) as cursor:
+            cursor.row_factory = None
+            rows = await cursor.fetchall()
+            decode = _row_decoder(model, _column_names(cursor.description))
+            return [decode(r) for r in rows]
+
     async def execute_script(self, script: str) -> None:
-        await self._conn.executescript(script)
-        await self._conn.commit()
+        async with self._write_lock:
+            await self._commit()
+            await self._conn.executescript(script)
+            await self._conn.commit()
+
+    # ── Maintenance ───────────────────────────
+
+    def idle_seconds(self) -> float:
+        """Seconds since the last write finished."""
+        return time.monotonic() - self._last_write
+
+    async def _run_maintenance(self, statement: str) -> tuple | None:
+        """Run a maintenance statement on the writer outside any open write transaction."""
+        async with self._write_lock:
+            await self._commit()
+            async with self._conn.execute(statement) as cursor:
+                row = await cursor.fetchone()
+            await self._conn.commit()
+        return tuple(row) if row is not None else None
+
+    async def checkpoint(self, mode: str = "PASSIVE") -> tuple[int, int, int]:
+        """Checkpoint the WAL. Returns (busy, wal_pages, checkpointed_pages).
+
+        PASSIVE copies what it can without waiting on readers; TRUNCATE also
+        waits for them and then shrinks the -wal file to zero bytes.
+        """
+        mode = mode.upper()
+        if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            raise ValueError(f"Unknown checkpoint mode: {mode}")
+        return await self._run_maintenance(f"PRAGMA wal_checkpoint({mode})")
+
+    async def optimize(self) -> None:
+        await self._run_maintenance("PRAGMA optimize")
+
+    async def analyze(self) -> None:
+        await self._run_maintenance("ANALYZE")
+
+    async def incremental_vacuum(self, pages: int) -> int:
+        """Return up to ``pages`` free pages to the filesystem; returns how many were freed.
+
+        Only does anything when the database uses auto_vacuum=INCREMENTAL.
+        """
+        before = await self.fetch_val("PRAGMA freelist_count")
+        if not before or await self.fetch_val("PRAGMA auto_vacuum") != 2:
+            return 0
+        # incremental_vacuum frees one page per VM step and returns no rows, so a
+        # cursor would stop after the first page; executescript runs it to completion
+        async with self._write_lock:
+            await self._commit()
+            await self._conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+        return before - await self.fetch_val("PRAGMA freelist_count")
+
+    async def storage_stats(self) -> dict[str, int]:
+        """Page counts and on-disk sizes for /status."""
+        page_size = await self.fetch_val("PRAGMA page_size")
+        wal_path = f"{self._db_path}-wal"
+        return {
+            "page_size": page_size,
+            "page_count": await self.fetch_val("PRAGMA page_count"),
+            "freelist_count": await self.fetch_val("PRAGMA freelist_count"),
+            "wal_bytes": os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+        }
+
+    async def backup_to(self, dest: str | Path, pages_per_step: int = 256,
+                        step_sleep: float = 0.01) -> int:
+        """Copy the database to ``dest`` with the online-backup API; returns pages copied.
+
+        The copy runs in a worker thread on its own read-only connection that
+        holds one read transaction throughout, so it is a consistent snapshot
+        and (under WAL) never blocks writers. Pages are copied
+        ``pages_per_step`` at a time with ``step_sleep`` seconds between
+        steps so the backup does not hog the disk.
+        """
+        if self._db_path == ":memory:":
+            raise ValueError("Cannot back up an in-memory database")
+        await self.flush()
+        return await asyncio.to_thread(
+            _backup_snapshot, self._db_path, str(dest), pages_per_step, step_sleep,
+        )
 
     async def close(self) -> None:
+        if self._readers is not None:
+            while not self._readers.empty():
+                await self._readers.get_nowait().close()
+            self._readers = None
         if self._conn:
+            await self.flush()
             await self._conn.close()
             logger.info("SQLite connection closed")
 
 
+def _backup_snapshot(source: str, dest: str, pages_per_step: int, step_sleep: float) -> int:
+    src = sqlite3.connect(f"{Path(source).resolve().as_uri()}?mode=ro", uri=True, isolation_level=None)
+    dst = sqlite3.connect(dest)
+    try:
+        # Pin one snapshot so concurrent writes don't restart the copy
+        src.execute("BEGIN")
+        src.execute("SELECT 1 FROM sqlite_master LIMIT 1")
+        src.backup(dst, pages=pages_per_step, sleep=step_sleep)
+        return dst.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        dst.close()
+        src.close()
+
+
+def _column_names(description: tuple) -> tuple[str, ...]:
+    return tuple(d[0] for d in description)
+
+
+@functools.lru_cache(maxsize=512)
+def _row_decoder(model: type[M], columns: tuple[str, ...]) -> Callable[[Sequence[Any]], M]:
+    """Build (once per model and column list) a function turning a row tuple into ``model``.
+
+    When the columns line up with the dataclass fields — the usual
+    ``SELECT *`` case — the row is splatted positionally. Otherwise the
+    matching columns are picked out by index and passed by name, so extra
+    columns are ignored and missing ones fall back to field defaults.
+    """
+    names = [f.name for f in dataclasses.fields(model)]
+    if list(columns) == names:
+        return lambda row: model(*row)
+
+    index = {col: i for i, col in enumerate(columns)}
+    picked = [(name, index[name]) for name in names if name in index]
+    keys = [name for name, _ in picked]
+    getter = operator.itemgetter(*[i for _, i in picked])
+    if len(picked) == 1:
+        return lambda row: model(**{keys[0]: getter(row)})
+    return lambda row: model(**dict(zip(keys, getter(row))))
+
+
+@functools.lru_cache(maxsize=1024)
+def _is_write(query: str) -> bool:
+    """True for statements that modify data (e.g. INSERT ... RETURNING via fetch_one)."""
+    return query.lstrip()[:7].upper().startswith(("INSERT", "UPDATE", "DELETE", "REPLACE"))
+
+
+@functools.lru_cache(maxsize=1024)
 def _convert_placeholders(query: str) -> tuple[str, bool]:
-    """Convert ? placeholders to $N for asyncpg. Returns (query, was_converted)."""
-    count = 0
+    """Convert ? placeholders to $N for asyncpg. Returns (query, was_converted).
+
+    Memoised: repositories reuse a fixed set of query strings, so after
+    warm-up every call is a dict hit instead of a regex pass.
+    """
+    parts = query.split("?")
+    if len(parts) == 1:
+        return query, False
+    converted = [parts[0]]
+    for i, part in enumerate(parts[1:], start=1):
+        converted.append(f"${i}")
+        converted.append(part)
+    return "".join(converted), True
+
+
+def _caching_connection_class() -> type:
+    import asyncpg
 
-    def replacer(match: re.Match) -> str:
-        nonlocal count
-        count += 1
-        return f"${count}"
+    class CachingConnection(asyncpg.Connection):
+        """asyncpg connection that remembers which statements it has prepared.
 
-    converted = re.sub(r"\?", replacer, query)
-    return converted, count > 0
+        asyncpg's own statement cache does the preparing and reuse, so
+        statements survive the connection going back to the pool; this LRU
+        mirrors it (same size, same eviction order) only to count hits.
+        """
+
+        def __init__(self, *args: Any, **kwargs: Any):
+            super().__init__(*args, **kwargs)
+            self.prepared: OrderedDict[str, None] = OrderedDict()
+
+    return CachingConnection
 
 
 class PostgreSQLEngine(DatabaseEngine):
-    """PostgreSQL engine using asyncpg with connection pooling."""
+    """PostgreSQL engine using asyncpg with connection pooling.
+
+    Statements are prepared server-side once per pooled connection by
+    asyncpg's statement cache, and the ?-to-$N rewrite is memoised, so hot
+    queries skip both the placeholder rewrite and the server re-parse.
 
-    def __init__(self, dsn: str):
+    Inside ``transaction()`` the owning task is pinned to one pooled
+    connection, so every statement it issues runs in the same transaction.
+    """
+
+    def __init__(self, dsn: str, statement_cache_size: int = 256):
         self._dsn = dsn
         self._pool = None
+        self._tx_conns: dict[asyncio.Task, Any] = {}
+        self._on_commit: dict[asyncio.Task, list[Callable[[], None]]] = {}
+        self._statement_cache_size = statement_cache_size
+        self._stmt_hits = 0
+        self._stmt_misses = 0
 
     async def connect(self) -> None:
         import asyncpg
-        self._pool = await asyncpg.create_pool(self._dsn, min_size=2, max_size=10)
+        self._pool = await asyncpg.create_pool(
+            self._dsn, min_size=2, max_size=10,
+            statement_cache_size=self._statement_cache_size,
+            connection_class=_caching_connection_class(),
+        )
         logger.info("PostgreSQL pool created: %s", self._dsn.split("@")[-1] if "@" in self._dsn else "local")
 
-    async def execute(self, query: str, params: tuple = ()) -> None:
-        query, _ = _convert_placeholders(query)
+    def _prepare(self, conn: Any, query: str) -> str:
+        """Convert a ?-style query and count it as a statement-cache hit or miss."""
+        seen = conn.prepared
+        if query in seen:
+            seen.move_to_end(query)
+            self._stmt_hits += 1
+        else:
+            self._stmt_misses += 1
+            seen[query] = None
+            if len(seen) > self._statement_cache_size:
+                seen.popitem(last=False)
+        return _convert_placeholders(query)[0]
+
+    def cache_stats(self) -> dict[str, int]:
+        """Hit/miss counters for the placeholder memo and statement cache."""
+        info = _convert_placeholders.cache_info()
+        return {
+            "placeholder_hits": info.hits,
+            "placeholder_misses": info.misses,
+            "placeholder_size": info.currsize,
+            "statement_hits": self._stmt_hits,
+            "statement_misses": self._stmt_misses,
+        }
+
+    @asynccontextmanager
+    async def _acquire(self) -> AsyncIterator[Any]:
+        """The current task's pinned transaction connection, or a pooled one."""
+        conn = self._tx_conns.get(asyncio.current_task())
+        if conn is not None:
+            yield conn
+            return
         async with self._pool.acquire() as conn:
-            await conn.execute(query, *params)
+            yield conn
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """Pin one pooled connection for the block; nested calls become savepoints."""
+        task = asyncio.current_task()
+        conn = self._tx_conns.get(task)
+        if conn is not None:
+            callbacks = self._on_commit[task]
+            mark = len(callbacks)
+            try:
+                async with conn.transaction():
+                    yield
+            except BaseException:
+                del callbacks[mark:]
+                raise
+            return
 
-    async def fetch_one(self, query: str, params: tuple = ()) -> dict[str, Any] | None:
-        query, _ = _convert_placeholders(query)
         async with self._pool.acquire() as conn:
-            row = await conn.fetchrow(query, *params)
+            self._tx_conns[task] = conn
+            self._on_commit[task] = []
+            try:
+                async with conn.transaction():
+                    yield
+            finally:
+                del self._tx_conns[task]
+                callbacks = self._on_commit.pop(task)
+        for callback in callbacks:
+            callback()
+
+    def in_transaction(self) -> bool:
+        return asyncio.current_task() in self._tx_conns
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        callbacks = self._on_commit.get(asyncio.current_task())
+        if callbacks is not None:
+            callbacks.append(callback)
+        else:
+            callback()
+
+    async def execute(self, query: str, params: tuple = ()) -> None:
+        async with self._acquire() as conn:
+            await conn.execute(self._prepare(conn, query), *params)
+
+    async def execute_many(self, query: str, rows: list[tuple]) -> None:
+        if not rows:
+            return
+        async with self._acquire() as conn:
+            sql = self._prepare(conn, query)
+            async with conn.transaction():
+                await conn.executemany(sql, rows)
+
+    async def bulk_copy(self, table: str, columns: Sequence[str], records: Iterable[tuple]) -> int:
+        """Binary COPY; values must already match the column types."""
+        records = records if isinstance(records, list) else list(records)
+        if not records:
+            return 0
+        async with self._acquire() as conn:
+            await conn.copy_records_to_table(table, records=records, columns=list(columns))
+        return len(records)
+
+    async def fetch_one(self, query: str, params: tuple = ()) -> dict[str, Any] | None:
+        async with self._acquire() as conn:
+            row = await conn.fetchrow(self._prepare(conn, query), *params)
             return dict(row) if row else None
 
     async def fetch_all(self, query: str, params: tuple = ()) -> list[dict[str, Any]]:
-        query, _ = _convert_placeholders(query)
-        async with self._pool.acquire() as conn:
-            rows = await conn.fetch(query, *params)
+        async with self._acquire() as conn:
+            rows = await conn.fetch(self._prepare(conn, query), *params)
             return [dict(r) for r in rows]
 
     async def fetch_val(self, query: str, params: tuple = ()) -> Any:
-        query, _ = _convert_placeholders(query)
-        async with self._pool.acquire() as conn:
-            return await conn.fetchval(query, *params)
+        async with self._acquire() as conn:
+            return await conn.fetchval(self._prepare(conn, query), *params)
+
+    async def fetch_model(self, query: str, params: tuple, model: type[M]) -> M | None:
+        async with self._acquire() as conn:
+            row = await conn.fetchrow(self._prepare(conn, query), *params)
+            if row is None:
+                return None
+            return _row_decoder(model, tuple(row.keys()))(row)
+
+    async def fetch_models(self, query: str, params: tuple, model: type[M]) -> list[M]:
+        async with self._acquire() as conn:
+            rows = await conn.fetch(self._prepare(conn, query), *params)
+            if not rows:
+                return []
+            decode = _row_decoder(model, tuple(rows[0].keys()))
+            return [decode(r) for r in rows]
 
     async def execute_script(self, script: str) -> None:
-        async with self._pool.acquire() as conn:
+        async with self._acquire() as conn:
             await conn.execute(script)
+        # Schema changes can invalidate cached plans on every pooled
+        # connection, not just this one: replace them all on next acquire
+        if self._pool is not None:
+            await self._pool.expire_connections()
 
     async def close(self) -> None:
         if self._pool:
@@ -141,14 +743,56 @@ class PostgreSQLEngine(DatabaseEngine):
             logger.info("PostgreSQL pool closed")
 
 
-async def create_engine(database_url: str) -> DatabaseEngine:
-    """Factory: create the correct engine based on DATABASE_URL prefix."""
+def _parse_sqlite_url(database_url: str) -> tuple[str, dict[str, str]]:
+    """Split sqlite:///path?key=value into (path, options)."""
+    rest = database_url.split("///", 1)[-1] if "///" in database_url else "bot.db"
+    path, _, query = rest.partition("?")
+    return path or "bot.db", dict(parse_qsl(query))
+
+
+def _validate_pragmas(pragmas: dict[str, Any]) -> dict[str, Any]:
+    """Check a profile against _SQLITE_PRAGMAS; values are interpolated into SQL."""
+    validated = {}
+    for name, value in pragmas.items():
+        if name not in _SQLITE_PRAGMAS:
+            raise ValueError(f"Unsupported SQLite pragma: {name}")
+        allowed = _SQLITE_PRAGMAS[name]
+        if allowed is None:
+            validated[name] = int(value)
+        elif str(value).upper() in allowed:
+            validated[name] = str(value).upper()
+        else:
+            raise ValueError(f"Invalid value for PRAGMA {name}: {value!r}")
+    return validated
+
+
+def _truthy(value: str | None) -> bool:
+    return (value or "").lower() in ("1", "true", "yes", "on")
+
+
+async def create_engine(database_url: str, sqlite_pragmas: dict[str, Any] | None = None) -> DatabaseEngine:
+    """Factory: create the correct engine based on DATABASE_URL prefix.
+
+    ``sqlite_pragmas`` is the SQLite performance profile; ignored for PostgreSQL.
+    """
     if database_url.startswith("sqlite"):
-        # sqlite:///path/to/db or sqlite:///bot.db
-        path = database_url.split("///", 1)[-1] if "///" in database_url else "bot.db"
-        engine = SQLiteEngine(path)
+        # sqlite:///path/to/db or sqlite:///bot.db?write_behind=1&commit_interval_ms=50
+        path, options = _parse_sqlite_url(database_url)
+        engine = SQLiteEngine(
+            path,
+            write_behind=_truthy(options.get("write_behind")),
+            commit_interval_ms=int(options.get("commit_interval_ms", 50)),
+            commit_batch=int(options.get("commit_batch", 200)),
+            read_connections=int(options.get("read_connections", 2)),
+            pragmas=sqlite_pragmas,
+        )
     elif database_url.startswith("postgresql") or database_url.startswith("postgres"):
-        engine = PostgreSQLEngine(database_url)
+        dsn, _, query = database_url.partition("?")
+        options = dict(parse_qsl(query))
+        cache_size = int(options.pop("statement_cache_size", 256))
+        if options:
+            dsn = f"{dsn}?{urlencode(options)}"
+        engine = PostgreSQLEngine(dsn, statement_cache_size=cache_size)
     else:
         raise ValueError(f"Unsupported DATABASE_URL scheme: {database_url}")
 
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import deque
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Sequence
+
+from database.engine import DatabaseEngine, M
+
+logger = logging.getLogger(__name__)
+slow_logger = logger.getChild("slow")
+
+# Latency samples kept per template for percentile estimates
+_SAMPLE_SIZE = 512
+
+
+@dataclass
+class QueryStats:
+    """Running totals for one SQL template."""
+    sql: str
+    count: int = 0
+    total_ms: float = 0.0
+    rows: int = 0
+    samples: deque[float] = field(default_factory=lambda: deque(maxlen=_SAMPLE_SIZE))
+
+    def record(self, elapsed_ms: float, rows: int) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.rows += rows
+        self.samples.append(elapsed_ms)
+
+    def percentile(self, pct: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "sql": self.sql,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 1),
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "rows": self.rows,
+        }
+
+
+# An IN list of one or more placeholders, however many the caller bound
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+
+
+def _template(query: str) -> str:
+    """Collapse whitespace so the same query from different call sites groups together.
+
+    ``IN (?, ?, ...)`` lists become ``IN (?...)``, so batch lookups of any
+    size share one entry instead of growing the stats without bound.
+    """
+    return _IN_LIST.sub("IN (?...)", " ".join(query.split()))
+
+
+def _redact(params: tuple) -> str:
+    """Describe parameters by type only — message content and IDs stay out of the logs."""
+    parts = []
+    for p in params:
+        if isinstance(p, (str, bytes)):
+            parts.append(f"<{type(p).__name__} len={len(p)}>")
+        else:
+            parts.append(f"<{type(p).__name__}>")
+    return f"({', '.join(parts)})"
+
+
+class InstrumentedEngine(DatabaseEngine):
+    """Wraps another engine and records per-query latency and row counts.
+
+    Queries slower than ``slow_query_ms`` are logged with their parameters
+    redacted. Anything not part of the engine interface (e.g. cache_stats)
+    is passed straight through to the wrapped engine.
+    """
+
+    def __init__(self, inner: DatabaseEngine, slow_query_ms: float = 250.0):
+        self._inner = inner
+        self._slow_query_ms = slow_query_ms
+        self._stats: dict[str, QueryStats] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._inner, name)
+
+    def _record(self, query: str, params: tuple, started: float, rows: int) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        template = _template(query)
+        stats = self._stats.get(template)
+        if stats is None:
+            stats = self._stats[template] = QueryStats(template)
+        stats.record(elapsed_ms, rows)
+        if elapsed_ms >= self._slow_query_ms:
+            slow_logger.warning("Slow query (%.1fms): %s %s", elapsed_ms, template, _redact(params))
+
+    async def execute(self, query: str, params: tuple = ()) -> None:
+        started = time.perf_counter()
+        try:
+            await self._inner.execute(query, params)
+        finally:
+            self._record(query, params, started, 0)
+
+    async def execute_many(self, query: str, rows: list[tuple]) -> None:
+        started = time.perf_counter()
+        try:
+            await self._inner.execute_many(query, rows)
+        finally:
+            self._record(query, (), started, 0)
+
+    async def bulk_copy(self, table: str, columns: Sequence[str], records: Iterable[tuple]) -> int:
+        started = time.perf_counter()
+        copied = 0
+        try:
+            copied = await self._inner.bulk_copy(table, columns, records)
+            return copied
+        finally:
+            self._record(f"COPY {table} ({', '.join(columns)})", (), started, copied)
+
+    async def fetch_one(self, query: str, params: tuple = ()) -> dict[str, Any] | None:
+        started = time.perf_counter()
+        row = None
+        try:
+            row = await self._inner.fetch_one(query, params)
+            return row
+        finally:
+            self._record(query, params, started, 0 if row is None else 1)
+
+    async def fetch_all(self, query: str, params: tuple = ()) -> list[dict[str, Any]]:
+        started = time.perf_counter()
+        rows: list[dict[str, Any]] = []
+        try:
+            rows = await self._inner.fetch_all(query, params)
+            return rows
+        finally:
+            self._record(query, params, started, len(rows))
+
+    async def fetch_val(self, query: str, params: tuple = ()) -> Any:
+        started = time.perf_counter()
+        value = None
+        try:
+            value = await self._inner.fetch_val(query, params)
+            return value
+        finally:
+            self._record(query, params, started, 0 if value is None else 1)
+
+    async def fetch_model(self, query: str, params: tuple, model: type[M]) -> M | None:
+        started = time.perf_counter()
+        obj = None
+        try:
+            obj = await self._inner.fetch_model(query, params, model)
+            return obj
+        finally:
+            self._record(query, params, started, 0 if obj is None else 1)
+
+    async def fetch_models(self, query: str, params: tuple, model: type[M]) -> list[M]:
+        started = time.perf_counter()
+        objs: list[M] = []
+        try:
+            objs = await self._inner.fetch_models(query, params, model)
+            return objs
+        finally:
+            self._record(query, params, started, len(objs))
+
+    def transaction(self) -> AbstractAsyncContextManager[None]:
+        return self._inner.transaction()
+
+    def in_transaction(self) -> bool:
+        return self._inner.in_transaction()
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        self._inner.after_commit(callback)
+
+    async def execute_script(self, script: str) -> None:
+        await self._inner.execute_script(script)
+
+    async def flush(self) -> None:
+        await self._inner.flush()
+
+    async def close(self) -> None:
+        await self._inner.close()
+
+    # ── Reporting ─────────────────────────────
+
+    def query_stats(self, limit: int = 10, order_by: str = "total_ms") -> list[dict[str, Any]]:
+        """Per-template summaries, most expensive first."""
+        summaries = [s.summary() for s in self._stats.values()]
+        summaries.sort(key=lambda s: s[order_by], reverse=True)
+        return summaries[:limit]
+
+    def reset_stats(self) -> None:
+        self._stats.clear()
@@ -1,44 +1,120 @@
 from __future__ import annotations
 
+import hashlib
 import logging
+import re
+from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+from core.errors import MigrationError
+
 if TYPE_CHECKING:
     from database.engine import DatabaseEngine
 
 logger = logging.getLogger(__name__)
 
-CURRENT_VERSION = 3
+# schema.sql is the baseline; everything after it lives in versions/
+BASELINE_VERSION = 3
 SCHEMA_PATH = Path(__file__).parent / "schema.sql"
+VERSIONS_DIR = Path(__file__).parent / "versions"
 
+_FILENAME_RE = re.compile(r"^(\d+)_(\w+)\.sql$")
 
-async def run_migrations(db: DatabaseEngine) -> None:
-    """Run schema migrations. Applies full schema on first run, then tracks version."""
-    # Ensure schema_version table exists (bootstrap)
+
+@dataclass(slots=True)
+class Migration:
+    version: int
+    name: str
+    sql: str
+    checksum: str
+
+
+def load_migrations(directory: Path = VERSIONS_DIR) -> list[Migration]:
+    """Read NNNN_name.sql files from ``directory``, ordered by version."""
+    migrations: dict[int, Migration] = {}
+    for path in sorted(directory.glob("*.sql")):
+        match = _FILENAME_RE.match(path.name)
+        if not match:
+            raise MigrationError(f"Unrecognised migration filename: {path.name}")
+        version = int(match.group(1))
+        if version <= BASELINE_VERSION:
+            raise MigrationError(
+                f"Migration {path.name} must be numbered above the baseline ({BASELINE_VERSION})"
+            )
+        if version in migrations:
+            raise MigrationError(f"Duplicate migration version {version}: {path.name}")
+        sql = path.read_text()
+        migrations[version] = Migration(
+            version=version,
+            name=match.group(2),
+            sql=sql,
+            checksum=hashlib.sha256(sql.encode()).hexdigest(),
+        )
+    return [migrations[v] for v in sorted(migrations)]
+
+
+async def _ensure_version_table(db: DatabaseEngine) -> None:
     await db.execute_script(
         "CREATE TABLE IF NOT EXISTS schema_version ("
         "  version INTEGER PRIMARY KEY,"
+        "  name TEXT,"
+        "  checksum TEXT,"
         "  applied_at TEXT NOT NULL DEFAULT (datetime('now'))"
         ");"
     )
+    # Databases created before numbered migrations only have (version, applied_at)
+    row = await db.fetch_one("SELECT * FROM schema_version LIMIT 1")
+    if row is not None and "checksum" not in row:
+        await db.execute_script(
+            "ALTER TABLE schema_version ADD COLUMN name TEXT;"
+            "ALTER TABLE schema_version ADD COLUMN checksum TEXT;"
+        )
 
-    current = await db.fetch_val("SELECT MAX(version) FROM schema_version")
-    if current is None:
-        current = 0
 
-    if current >= CURRENT_VERSION:
-        logger.info("Schema up to date (version %d)", current)
-        return
+async def run_migrations(db: DatabaseEngine) -> None:
+    """Run schema migrations.
 
-    # Apply full schema
-    logger.info("Applying schema version %d (current: %d)", CURRENT_VERSION, current)
-    schema_sql = SCHEMA_PATH.read_text()
-    await db.execute_script(schema_sql)
+    Applies the baseline schema on first run, then every numbered migration
+    in ``versions/`` that has not been applied yet, in order. Applied
+    migrations are checksummed; editing one after it has shipped raises
+    MigrationError instead of silently diverging.
+    """
+    await _ensure_version_table(db)
 
-    # Record version
-    await db.execute(
-        "INSERT OR REPLACE INTO schema_version (version) VALUES (?)",
-        (CURRENT_VERSION,),
-    )
-    logger.info("Schema migrated to version %d", CURRENT_VERSION)
+    applied = {
+        row["version"]: row
+        for row in await db.fetch_all("SELECT version, name, checksum FROM schema_version")
+    }
+    current = max(applied, default=0)
+
+    if current < BASELINE_VERSION:
+        logger.info("Applying baseline schema version %d (current: %d)", BASELINE_VERSION, current)
+        await db.execute_script(SCHEMA_PATH.read_text())
+        await db.execute(
+            "INSERT OR REPLACE INTO schema_version (version, name) VALUES (?, ?)",
+            (BASELINE_VERSION, "baseline"),
+        )
+
+    pending = []
+    for migration in load_migrations():
+        row = applied.get(migration.version)
+        if row is None:
+            pending.append(migration)
+        elif row["checksum"] != migration.checksum:
+            raise MigrationError(
+                f"Migration {migration.version:04d}_{migration.name} was modified after it was applied"
+            )
+
+    if not pending:
+        logger.info("Schema up to date (version %d)", max(current, BASELINE_VERSION))
+        return
+
+    for migration in pending:
+        logger.info("Applying migration %04d_%s", migration.version, migration.name)
+        await db.execute_script(migration.sql)
+        await db.execute(
+            "INSERT INTO schema_version (version, name, checksum) VALUES (?, ?, ?)",
+            (migration.version, migration.name, migration.checksum),
+        )
+    logger.info("Schema migrated to version %d", pending[-1].version)
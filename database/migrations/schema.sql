@@ -5,6 +5,8 @@
 -- Schema version tracking
 CREATE TABLE IF NOT EXISTS schema_version (
     version     INTEGER PRIMARY KEY,
+    name        TEXT,
+    checksum    TEXT,
     applied_at  TEXT NOT NULL DEFAULT (datetime('now'))
 );
 
@@ -0,0 +1,17 @@
+-- ──────────────────────────────────────────────
+-- 0004 — Indexes for hot-path queries
+-- ──────────────────────────────────────────────
+
+-- mark_edited / increment_reaction look rows up by Discord message ID
+CREATE INDEX IF NOT EXISTS idx_msg_tracking_message ON message_tracking(message_id);
+
+-- count_reactions_on_message filters on source and details together;
+-- the composite index also covers source-only lookups
+CREATE INDEX IF NOT EXISTS idx_xp_history_source_details ON xp_history(source, details);
+DROP INDEX IF EXISTS idx_xp_history_source;
+
+-- Leaderboard and rank walk approved users in XP order
+CREATE INDEX IF NOT EXISTS idx_users_status_xp ON users(status, total_xp DESC);
+
+-- cancel_by_type_and_payload narrows by type before scanning payloads
+CREATE INDEX IF NOT EXISTS idx_timers_type ON timers(timer_type, fired, cancelled);
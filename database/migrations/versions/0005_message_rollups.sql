@@ -0,0 +1,29 @@
+-- ──────────────────────────────────────────────
+-- 0005 — Monthly rollups of message_tracking
+-- ──────────────────────────────────────────────
+
+-- One row per closed month; lets raw message_tracking rows be pruned
+CREATE TABLE IF NOT EXISTS message_monthly_summary (
+    month                       TEXT PRIMARY KEY,
+    message_count               INTEGER NOT NULL DEFAULT 0,
+    attachment_count            INTEGER NOT NULL DEFAULT 0,
+    longest_message_id          INTEGER,
+    longest_user_id             INTEGER,
+    longest_channel_id          INTEGER,
+    longest_char_count          INTEGER NOT NULL DEFAULT 0,
+    top_attachment_message_id   INTEGER,
+    top_attachment_user_id      INTEGER,
+    top_attachment_channel_id   INTEGER,
+    top_attachment_reactions    INTEGER NOT NULL DEFAULT 0,
+    created_at                  TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- Per-channel totals for each rolled-up month
+CREATE TABLE IF NOT EXISTS message_monthly_channels (
+    month           TEXT NOT NULL,
+    channel_id      INTEGER NOT NULL,
+    message_count   INTEGER NOT NULL DEFAULT 0,
+    char_count      INTEGER NOT NULL DEFAULT 0,
+    reaction_count  INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (month, channel_id)
+);
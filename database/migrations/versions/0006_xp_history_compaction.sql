@@ -0,0 +1,14 @@
+-- ──────────────────────────────────────────────
+-- 0006 — xp_history compaction
+-- ──────────────────────────────────────────────
+
+-- Compaction walks xp_history one day at a time
+CREATE INDEX IF NOT EXISTS idx_xp_history_created ON xp_history(created_at);
+
+-- One row per compacted day; the next run resumes after the latest
+CREATE TABLE IF NOT EXISTS xp_compaction (
+    day             TEXT PRIMARY KEY,
+    raw_rows        INTEGER NOT NULL,
+    compacted_rows  INTEGER NOT NULL,
+    compacted_at    TEXT NOT NULL DEFAULT (datetime('now'))
+);
@@ -5,7 +5,7 @@ from datetime import datetime
 from typing import Any
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     user_id: int
     username: str | None = None
@@ -26,7 +26,7 @@ class User:
     updated_at: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class XPEntry:
     id: int = 0
     user_id: int = 0
@@ -36,7 +36,7 @@ class XPEntry:
     created_at: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Intro:
     id: int = 0
     user_id: int = 0
@@ -57,7 +57,7 @@ class Intro:
     created_at: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Ticket:
     id: int = 0
     channel_id: int | None = None
@@ -77,7 +77,7 @@ class Ticket:
     created_at: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class TicketLog:
     id: int = 0
     ticket_id: int = 0
@@ -87,7 +87,7 @@ class TicketLog:
     created_at: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class BullyInsult:
     id: int = 0
     text: str = ""
@@ -97,7 +97,7 @@ class BullyInsult:
     created_at: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class MusicConversion:
     id: int = 0
     source_url: str = ""
@@ -110,7 +110,7 @@ class MusicConversion:
     created_at: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class AutoThreadConfig:
     channel_id: int = 0
     enabled: bool = True
@@ -123,7 +123,7 @@ class AutoThreadConfig:
     updated_at: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Timer:
     id: int = 0
     timer_type: str = ""
@@ -134,7 +134,7 @@ class Timer:
     created_at: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class AuditEntry:
     id: int = 0
     event_type: str = ""
@@ -145,7 +145,7 @@ class AuditEntry:
     created_at: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Milestone:
     id: int = 0
     user_id: int = 0
@@ -154,7 +154,7 @@ class Milestone:
     created_at: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Achievement:
     id: int = 0
     key: str = ""
@@ -170,7 +170,7 @@ class Achievement:
     created_at: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class UserAchievement:
     id: int = 0
     user_id: int = 0
@@ -179,7 +179,7 @@ class UserAchievement:
     notified: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class DailyStat:
     id: int = 0
     date: str = ""
@@ -193,7 +193,7 @@ class DailyStat:
     channels_active: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class MessageTracking:
     id: int = 0
     message_id: int = 0
@@ -207,7 +207,7 @@ class MessageTracking:
     created_at: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class MonthlyReport:
     id: int = 0
     month: str = ""
@@ -0,0 +1,228 @@
+"""Query-plan regression check for repository SQL.
+
+Builds a synthetic SQLite database from the baseline schema plus every
+numbered migration, pulls each literal SQL string passed to ``self.db`` in
+``database/repositories/*.py``, and runs ``EXPLAIN QUERY PLAN`` on it. Hot
+queries that fall back to a full table scan fail the check.
+
+    python -m database.query_plans            # hot-path failures only
+    python -m database.query_plans --all      # print every plan
+
+Exits non-zero when a hot-path query scans a table.
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import random
+import re
+import sqlite3
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from database.migrations.migrate import SCHEMA_PATH, load_migrations
+
+REPOSITORIES_DIR = Path(__file__).parent / "repositories"
+
+# Queries that run per message / reaction / command and must stay on an index
+HOT_PATHS = {
+    "UserRepository.get",
+    "UserRepository.add_xp",
+    "UserRepository.get_leaderboard",
+    "UserRepository.get_rank",
+    "XPRepository.get_history",
+    "XPRepository.count_reactions_on_message",
+    "TimerRepository.get_pending",
+    "TimerRepository.cancel_by_type_and_payload",
+    "MonthlyStatsRepository.mark_edited",
+    "MonthlyStatsRepository.increment_reaction",
+    "MonthlyStatsRepository.get_monthly_top_messages",
+    "MonthlyStatsRepository.get_monthly_top_voice",
+    "MonthlyStatsRepository.get_monthly_top_reactors",
+    "MonthlyStatsRepository.get_monthly_most_mentioned",
+    "MonthlyStatsRepository.get_monthly_most_edits",
+    "MonthlyStatsRepository.get_monthly_longest_message",
+    "MonthlyStatsRepository.get_monthly_top_word",
+    "MonthlyStatsRepository.get_monthly_most_reacted_image",
+    "MonthlyStatsRepository.get_monthly_top_channels",
+    "MonthlyStatsRepository.get_active_days",
+    "MonthlyStatsRepository.get_monthly_most_active_days",
+    "MonthlyStatsRepository.get_user_monthly_stats",
+    "AchievementRepository.get_user_achievements",
+    "TicketRepository.get_open_for_user",
+}
+
+_ENGINE_METHODS = {
+    "execute", "execute_many", "insert_returning",
+    "fetch_one", "fetch_all", "fetch_val", "fetch_model", "fetch_models",
+}
+
+# "SCAN users" and an unconstrained "SCAN users USING INDEX ..." both visit every row;
+# only a SEARCH (or a SCAN with a constraint in parentheses) narrows the range
+_FULL_SCAN_RE = re.compile(r"^SCAN (\w+)(?: USING (?:COVERING )?INDEX \w+)?$")
+
+_SYNTHETIC_ROWS = 2000
+
+
+@dataclass(slots=True)
+class RepositoryQuery:
+    name: str
+    sql: str
+    location: str
+    plan: list[str] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def full_scans(self) -> list[str]:
+        return [m.group(1) for line in self.plan if (m := _FULL_SCAN_RE.match(line))]
+
+
+def _literal(node: ast.AST, constants: dict[str, str]) -> str | None:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.Name):
+        return constants.get(node.id)
+    return None
+
+
+def collect_queries(directory: Path = REPOSITORIES_DIR) -> tuple[list[RepositoryQuery], list[str]]:
+    """Return the literal SQL in each repository method and the call sites that build SQL dynamically."""
+    queries: list[RepositoryQuery] = []
+    dynamic: list[str] = []
+    for path in sorted(directory.glob("*.py")):
+        tree = ast.parse(path.read_text(), filename=str(path))
+        for cls in (n for n in tree.body if isinstance(n, ast.ClassDef)):
+            for func in cls.body:
+                if not isinstance(func, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    continue
+                constants = {
+                    target.id: node.value.value
+                    for node in ast.walk(func)
+                    if isinstance(node, ast.Assign)
+                    and isinstance(node.value, ast.Constant)
+                    and isinstance(node.value.value, str)
+                    for target in node.targets
+                    if isinstance(target, ast.Name)
+                }
+                for node in ast.walk(func):
+                    if not (
+                        isinstance(node, ast.Call)
+                        and isinstance(node.func, ast.Attribute)
+                        and node.func.attr in _ENGINE_METHODS
+                        and ast.unparse(node.func.value) == "self.db"
+                        and node.args
+                    ):
+                        continue
+                    name = f"{cls.name}.{func.name}"
+                    location = f"{path.name}:{node.lineno}"
+                    sql = _literal(node.args[0], constants)
+                    if sql is None:
+                        dynamic.append(f"{name} ({location})")
+                        continue
+                    if node.func.attr == "insert_returning":
+                        sql = f"{sql.rstrip()} RETURNING id"
+                    queries.append(RepositoryQuery(name, sql, location))
+    return queries, dynamic
+
+
+def _synthetic_value(column: str, col_type: str, rng: random.Random) -> object:
+    if column == "date":
+        return f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    if column.endswith("_at"):
+        return f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 12:00:00"
+    if column == "status":
+        return rng.choice(("pending", "approved", "approved", "approved", "rejected"))
+    if "INT" in col_type.upper():
+        if column.endswith("_id") or column == "id":
+            return rng.randint(1, _SYNTHETIC_ROWS)
+        return rng.randint(0, 1000)
+    return f"{column}-{rng.randint(1, _SYNTHETIC_ROWS // 4)}"
+
+
+def build_database() -> sqlite3.Connection:
+    """In-memory database with the full schema, synthetic rows and fresh statistics."""
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA_PATH.read_text())
+    for migration in load_migrations():
+        conn.executescript(migration.sql)
+
+    rng = random.Random(0)
+    tables = [
+        row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )
+    ]
+    for table in tables:
+        columns = [
+            (name, col_type)
+            for _, name, col_type, _, _, pk in conn.execute(f"PRAGMA table_info({table})")
+            if not (pk and col_type.upper() == "INTEGER")
+        ]
+        names = ", ".join(name for name, _ in columns)
+        placeholders = ", ".join("?" for _ in columns)
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {table} ({names}) VALUES ({placeholders})",
+            (
+                tuple(_synthetic_value(name, col_type, rng) for name, col_type in columns)
+                for _ in range(_SYNTHETIC_ROWS)
+            ),
+        )
+    conn.commit()
+    conn.execute("ANALYZE")
+    return conn
+
+
+def explain(conn: sqlite3.Connection, query: RepositoryQuery) -> None:
+    params = (None,) * query.sql.count("?")
+    try:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {query.sql}", params).fetchall()
+    except sqlite3.Error as exc:
+        query.error = str(exc)
+        return
+    query.plan = [row[3] for row in rows]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--all", action="store_true", help="print the plan for every query")
+    args = parser.parse_args(argv)
+
+    queries, dynamic = collect_queries()
+    conn = build_database()
+    try:
+        for query in queries:
+            explain(conn, query)
+    finally:
+        conn.close()
+
+    failures = 0
+    for query in queries:
+        hot = query.name in HOT_PATHS
+        failed = query.error is not None or (hot and query.full_scans)
+        failures += bool(failed)
+        if failed or args.all or query.full_scans:
+            marker = "FAIL" if failed else ("scan" if query.full_scans else "ok")
+            print(f"[{marker}] {query.name} ({query.location}){' [hot]' if hot else ''}")
+            if query.error:
+                print(f"    error: {query.error}")
+            if failed or args.all:
+                print(f"    {' '.join(query.sql.split())}")
+                for line in query.plan:
+                    print(f"    -> {line}")
+
+    missing = HOT_PATHS - {q.name for q in queries}
+    for name in sorted(missing):
+        print(f"[FAIL] {name}: listed as hot but no literal query found")
+    failures += len(missing)
+
+    if args.all:
+        for site in dynamic:
+            print(f"[skip] {site}: SQL built at runtime")
+
+    print(f"{len(queries)} queries checked, {len(dynamic)} dynamic skipped, {failures} failing")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
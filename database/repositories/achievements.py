@@ -17,39 +17,34 @@ class AchievementRepository:
         self.db = db
 
     async def get(self, achievement_id: int) -> Achievement | None:
-        row = await self.db.fetch_one("SELECT * FROM achievements WHERE id = ?", (achievement_id,))
-        return Achievement(**row) if row else None
+        return await self.db.fetch_model("SELECT * FROM achievements WHERE id = ?", (achievement_id,), Achievement)
 
     async def get_by_key(self, key: str) -> Achievement | None:
-        row = await self.db.fetch_one("SELECT * FROM achievements WHERE key = ?", (key,))
-        return Achievement(**row) if row else None
+        return await self.db.fetch_model("SELECT * FROM achievements WHERE key = ?", (key,), Achievement)
 
     async def get_active(self) -> list[Achievement]:
-        rows = await self.db.fetch_all(
+        return await self.db.fetch_models(
             "SELECT * FROM achievements WHERE active = 1 ORDER BY trigger_type, trigger_value",
+            (), Achievement,
         )
-        return [Achievement(**r) for r in rows]
 
     async def get_by_trigger(self, trigger_type: str) -> list[Achievement]:
-        rows = await self.db.fetch_all(
+        return await self.db.fetch_models(
             "SELECT * FROM achievements WHERE trigger_type = ? AND active = 1 ORDER BY trigger_value",
-            (trigger_type,),
+            (trigger_type,), Achievement,
         )
-        return [Achievement(**r) for r in rows]
 
     async def get_all(self) -> list[Achievement]:
-        rows = await self.db.fetch_all("SELECT * FROM achievements ORDER BY category, trigger_value")
-        return [Achievement(**r) for r in rows]
+        return await self.db.fetch_models("SELECT * FROM achievements ORDER BY category, trigger_value", (), Achievement)
 
     async def create(self, key: str, name: str, description: str, trigger_type: str,
                      trigger_value: int, icon: str = "star", rarity: str = "common",
                      category: str = "general", xp_reward: int = 0) -> int:
-        await self.db.execute(
+        return await self.db.insert_returning(
             "INSERT INTO achievements (key, name, description, icon, rarity, category, "
             "trigger_type, trigger_value, xp_reward) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
             (key, name, description, icon, rarity, category, trigger_type, trigger_value, xp_reward),
         )
-        return await self.db.fetch_val("SELECT last_insert_rowid()")
 
     async def update(self, achievement_id: int, **kwargs) -> None:
         if not kwargs:
@@ -59,37 +54,27 @@ class AchievementRepository:
         await self.db.execute(f"UPDATE achievements SET {sets} WHERE id = ?", tuple(vals))
 
     async def delete(self, achievement_id: int) -> None:
-        await self.db.execute("DELETE FROM user_achievements WHERE achievement_id = ?", (achievement_id,))
-        await self.db.execute("DELETE FROM achievements WHERE id = ?", (achievement_id,))
+        async with self.db.transaction():
+            await self.db.execute("DELETE FROM user_achievements WHERE achievement_id = ?", (achievement_id,))
+            await self.db.execute("DELETE FROM achievements WHERE id = ?", (achievement_id,))
 
     # ── User Achievements ─────────────────────
 
     async def unlock(self, user_id: int, achievement_id: int) -> bool:
         """Unlock an achievement for a user. Returns False if already unlocked."""
-        existing = await self.db.fetch_one(
-            "SELECT id FROM user_achievements WHERE user_id = ? AND achievement_id = ?",
+        row_id = await self.db.fetch_val(
+            "INSERT INTO user_achievements (user_id, achievement_id) VALUES (?, ?) "
+            "ON CONFLICT(user_id, achievement_id) DO NOTHING RETURNING id",
             (user_id, achievement_id),
         )
-        if existing:
-            return False
-        await self.db.execute(
-            "INSERT INTO user_achievements (user_id, achievement_id) VALUES (?, ?)",
-            (user_id, achievement_id),
-        )
-        return True
+        return row_id is not None
 
     async def revoke(self, user_id: int, achievement_id: int) -> bool:
-        existing = await self.db.fetch_one(
-            "SELECT id FROM user_achievements WHERE user_id = ? AND achievement_id = ?",
-            (user_id, achievement_id),
-        )
-        if not existing:
-            return False
-        await self.db.execute(
-            "DELETE FROM user_achievements WHERE user_id = ? AND achievement_id = ?",
+        row_id = await self.db.fetch_val(
+            "DELETE FROM user_achievements WHERE user_id = ? AND achievement_id = ? RETURNING id",
             (user_id, achievement_id),
         )
-        return True
+        return row_id is not None
 
     async def mark_notified(self, user_id: int, achievement_id: int) -> None:
         await self.db.execute(
@@ -33,10 +33,9 @@ class AuditRepository:
             VALUES (?, ?, ?, ?, ?)
             RETURNING *
         """
-        row = await self.db.fetch_one(
-            query, event_type, severity, actor_id, target_id, details
+        return await self.db.fetch_model(
+            query, (event_type, severity, actor_id, target_id, details), AuditEntry
         )
-        return AuditEntry(**row)
 
     async def get_recent(self, limit: int = 100) -> list[AuditEntry]:
         """Get recent audit entries for debugging when shit hits the fan"""
@@ -45,8 +44,7 @@ class AuditRepository:
             ORDER BY created_at DESC
             LIMIT ?
         """
-        rows = await self.db.fetch_all(query, limit)
-        return [AuditEntry(**row) for row in rows]
+        return await self.db.fetch_models(query, (limit,), AuditEntry)
 
     async def get_by_actor(self, actor_id: int, limit: int = 50) -> list[AuditEntry]:
         """Get audit entries for specific user — useful for seeing what they've been up to"""
@@ -56,8 +54,7 @@ class AuditRepository:
             ORDER BY created_at DESC
             LIMIT ?
         """
-        rows = await self.db.fetch_all(query, actor_id, limit)
-        return [AuditEntry(**row) for row in rows]
+        return await self.db.fetch_models(query, (actor_id, limit), AuditEntry)
 
     async def get_by_event_type(
         self, event_type: str, limit: int = 100
@@ -69,8 +66,7 @@ class AuditRepository:
             ORDER BY created_at DESC
             LIMIT ?
         """
-        rows = await self.db.fetch_all(query, event_type, limit)
-        return [AuditEntry(**row) for row in rows]
+        return await self.db.fetch_models(query, (event_type, limit), AuditEntry)
 
     async def get_critical(self, limit: int = 50) -> list[AuditEntry]:
         """Get critical severity entries — the oh fuck moments"""
@@ -80,5 +76,4 @@ class AuditRepository:
             ORDER BY created_at DESC
             LIMIT ?
         """
-        rows = await self.db.fetch_all(query, limit)
-        return [AuditEntry(**row) for row in rows]
+        return await self.db.fetch_models(query, (limit,), AuditEntry)
@@ -13,17 +13,16 @@ class BullyRepository:
         self.db = db
 
     async def get_random_active(self) -> BullyInsult | None:
-        row = await self.db.fetch_one(
+        return await self.db.fetch_model(
             "SELECT * FROM bully_insults WHERE active = 1 ORDER BY RANDOM() LIMIT 1",
+            (), BullyInsult,
         )
-        return BullyInsult(**row) if row else None
 
     async def add(self, text: str, added_by: int) -> int:
-        await self.db.execute(
+        return await self.db.insert_returning(
             "INSERT INTO bully_insults (text, added_by) VALUES (?, ?)",
             (text, added_by),
         )
-        return await self.db.fetch_val("SELECT last_insert_rowid()")
 
     async def remove(self, insult_id: int, removed_by: int) -> bool:
         row = await self.db.fetch_one(
@@ -52,12 +51,10 @@ class BullyRepository:
 
     async def list_all(self, active_only: bool = True) -> list[BullyInsult]:
         if active_only:
-            rows = await self.db.fetch_all(
-                "SELECT * FROM bully_insults WHERE active = 1 ORDER BY id",
-            )
+            query = "SELECT * FROM bully_insults WHERE active = 1 ORDER BY id"
         else:
-            rows = await self.db.fetch_all("SELECT * FROM bully_insults ORDER BY id")
-        return [BullyInsult(**r) for r in rows]
+            query = "SELECT * FROM bully_insults ORDER BY id"
+        return await self.db.fetch_models(query, (), BullyInsult)
 
     async def count_active(self) -> int:
         return await self.db.fetch_val(
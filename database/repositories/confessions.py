@@ -25,8 +25,7 @@ class ConfessionRepository:
             INSERT INTO confessions (confession_num, user_id, content)
             VALUES (?, ?, ?)
         """
-        await self.db.execute(query, (next_num, user_id, content))
-        return await self.db.fetch_val("SELECT last_insert_rowid()")
+        return await self.db.insert_returning(query, (next_num, user_id, content))
 
     async def get_pending(self) -> list[dict]:
         """Get all pending confessions (not approved or rejected)"""
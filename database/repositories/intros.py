@@ -15,31 +15,27 @@ class IntroRepository:
     async def create(self, user_id: int, age: int, preferred_name: str,
                      pronouns: str, location: str, region_key: str | None,
                      bio: str, submission_num: int = 1) -> int:
-        await self.db.execute(
+        return await self.db.insert_returning(
             "INSERT INTO intros (user_id, age, preferred_name, pronouns, location, "
             "region_key, bio, submission_num) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
             (user_id, age, preferred_name, pronouns, location, region_key, bio, submission_num),
         )
-        row_id = await self.db.fetch_val("SELECT last_insert_rowid()")
-        return row_id
 
     async def get(self, intro_id: int) -> Intro | None:
-        row = await self.db.fetch_one("SELECT * FROM intros WHERE id = ?", (intro_id,))
-        return Intro(**row) if row else None
+        return await self.db.fetch_model("SELECT * FROM intros WHERE id = ?", (intro_id,), Intro)
 
     async def get_latest_for_user(self, user_id: int) -> Intro | None:
-        row = await self.db.fetch_one(
+        return await self.db.fetch_model(
             "SELECT * FROM intros WHERE user_id = ? ORDER BY created_at DESC LIMIT 1",
-            (user_id,),
+            (user_id,), Intro,
         )
-        return Intro(**row) if row else None
 
     async def get_pending(self) -> list[Intro]:
-        rows = await self.db.fetch_all(
+        return await self.db.fetch_models(
             "SELECT * FROM intros WHERE status IN ('submitted', 'resubmitted') "
             "ORDER BY created_at ASC",
+            (), Intro,
         )
-        return [Intro(**r) for r in rows]
 
     async def count_for_user(self, user_id: int) -> int:
         count = await self.db.fetch_val(
@@ -33,11 +33,10 @@ class MilestoneRepository:
         )
 
     async def get_for_user(self, user_id: int) -> list[Milestone]:
-        rows = await self.db.fetch_all(
+        return await self.db.fetch_models(
             "SELECT * FROM milestones WHERE user_id = ? ORDER BY level ASC",
-            (user_id,),
+            (user_id,), Milestone,
         )
-        return [Milestone(**r) for r in rows]
 
     async def has_reached(self, user_id: int, level: int) -> bool:
         count = await self.db.fetch_val(
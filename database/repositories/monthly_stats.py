@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from collections import Counter
 from typing import TYPE_CHECKING, Any
 
 from database.models import DailyStat, MessageTracking, MonthlyReport
@@ -9,6 +10,13 @@ if TYPE_CHECKING:
     from database.engine import DatabaseEngine
 
 
+def _month_range(month: str) -> tuple[str, str]:
+    """Half-open bounds for a YYYY-MM month that an index on a date column can range-scan."""
+    year, mon = map(int, month.split("-"))
+    year, mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+    return month, f"{year:04d}-{mon:02d}"
+
+
 class MonthlyStatsRepository:
     def __init__(self, db: DatabaseEngine):
         self.db = db
@@ -16,71 +24,48 @@ class MonthlyStatsRepository:
     # ── Daily Stats ───────────────────────────
 
     async def upsert_daily(self, date: str, user_id: int, **kwargs) -> None:
-        existing = await self.db.fetch_one(
-            "SELECT id FROM daily_stats WHERE date = ? AND user_id = ?",
-            (date, user_id),
-        )
-        if existing is None:
-            cols = ["date", "user_id"] + list(kwargs.keys())
-            placeholders = ", ".join("?" for _ in cols)
-            vals = [date, user_id] + list(kwargs.values())
-            await self.db.execute(
-                f"INSERT INTO daily_stats ({', '.join(cols)}) VALUES ({placeholders})",
-                tuple(vals),
-            )
+        cols = ["date", "user_id"] + list(kwargs.keys())
+        placeholders = ", ".join("?" for _ in cols)
+        vals = [date, user_id] + list(kwargs.values())
+        if kwargs:
+            sets = ", ".join(f"{k} = daily_stats.{k} + excluded.{k}" if k != "channels_active" and k != "longest_message"
+                             else f"{k} = MAX(daily_stats.{k}, excluded.{k})" if k == "longest_message"
+                             else f"{k} = excluded.{k}"
+                             for k in kwargs)
+            conflict = f"DO UPDATE SET {sets}"
         else:
-            if not kwargs:
-                return
-            sets = ", ".join(f"{k} = {k} + ?" if k != "channels_active" and k != "longest_message"
-                            else f"{k} = MAX({k}, ?)" if k == "longest_message"
-                            else f"{k} = ?"
-                            for k in kwargs)
-            vals = list(kwargs.values()) + [date, user_id]
-            await self.db.execute(
-                f"UPDATE daily_stats SET {sets} WHERE date = ? AND user_id = ?",
-                tuple(vals),
-            )
+            conflict = "DO NOTHING"
+        await self.db.execute(
+            f"INSERT INTO daily_stats ({', '.join(cols)}) VALUES ({placeholders}) "
+            f"ON CONFLICT(date, user_id) {conflict}",
+            tuple(vals),
+        )
 
     async def increment_daily(self, date: str, user_id: int, field: str, amount: int = 1) -> None:
-        existing = await self.db.fetch_one(
-            "SELECT id FROM daily_stats WHERE date = ? AND user_id = ?",
-            (date, user_id),
+        await self.db.execute(
+            f"INSERT INTO daily_stats (date, user_id, {field}) VALUES (?, ?, ?) "
+            f"ON CONFLICT(date, user_id) DO UPDATE SET {field} = daily_stats.{field} + excluded.{field}",
+            (date, user_id, amount),
         )
-        if existing is None:
-            await self.db.execute(
-                f"INSERT INTO daily_stats (date, user_id, {field}) VALUES (?, ?, ?)",
-                (date, user_id, amount),
-            )
-        else:
-            await self.db.execute(
-                f"UPDATE daily_stats SET {field} = {field} + ? WHERE date = ? AND user_id = ?",
-                (amount, date, user_id),
-            )
 
     async def update_longest_message(self, date: str, user_id: int, char_count: int) -> None:
-        existing = await self.db.fetch_one(
-            "SELECT id, longest_message FROM daily_stats WHERE date = ? AND user_id = ?",
-            (date, user_id),
+        await self.db.execute(
+            "INSERT INTO daily_stats (date, user_id, longest_message) VALUES (?, ?, ?) "
+            "ON CONFLICT(date, user_id) DO UPDATE SET "
+            "longest_message = MAX(daily_stats.longest_message, excluded.longest_message)",
+            (date, user_id, char_count),
         )
-        if existing is None:
-            await self.db.execute(
-                "INSERT INTO daily_stats (date, user_id, longest_message) VALUES (?, ?, ?)",
-                (date, user_id, char_count),
-            )
-        elif char_count > (existing["longest_message"] or 0):
-            await self.db.execute(
-                "UPDATE daily_stats SET longest_message = ? WHERE id = ?",
-                (char_count, existing["id"]),
-            )
 
     # ── Message Tracking ──────────────────────
 
-    async def track_message(self, message_id: int, user_id: int, channel_id: int,
-                            char_count: int, word_count: int, has_attachment: bool) -> None:
-        await self.db.execute(
-            "INSERT INTO message_tracking (message_id, user_id, channel_id, char_count, "
-            "word_count, has_attachment) VALUES (?, ?, ?, ?, ?, ?)",
-            (message_id, user_id, channel_id, char_count, word_count, int(has_attachment)),
+    async def track_messages(self, rows: list[tuple[int, int, int, int, int, int, int, int, str]]) -> int:
+        """Append buffered messages: (message_id, user_id, channel_id, char_count, word_count,
+        has_attachment, reaction_count, edited, created_at)."""
+        return await self.db.bulk_copy(
+            "message_tracking",
+            ("message_id", "user_id", "channel_id", "char_count", "word_count",
+             "has_attachment", "reaction_count", "edited", "created_at"),
+            rows,
         )
 
     async def mark_edited(self, message_id: int) -> None:
@@ -97,147 +82,139 @@ class MonthlyStatsRepository:
 
     # ── Channel Stats ─────────────────────────
 
-    async def increment_channel(self, date: str, channel_id: int, user_id: int) -> None:
-        existing = await self.db.fetch_one(
-            "SELECT id FROM channel_stats WHERE date = ? AND channel_id = ?",
-            (date, channel_id),
+    async def increment_channel(self, date: str, channel_id: int, user_id: int, count: int = 1) -> None:
+        await self.db.execute(
+            "INSERT INTO channel_stats (date, channel_id, message_count, unique_users) VALUES (?, ?, ?, 1) "
+            "ON CONFLICT(date, channel_id) DO UPDATE SET "
+            "message_count = channel_stats.message_count + excluded.message_count",
+            (date, channel_id, count),
         )
-        if existing is None:
-            await self.db.execute(
-                "INSERT INTO channel_stats (date, channel_id, message_count, unique_users) VALUES (?, ?, 1, 1)",
-                (date, channel_id),
-            )
-        else:
-            await self.db.execute(
-                "UPDATE channel_stats SET message_count = message_count + 1 WHERE date = ? AND channel_id = ?",
-                (date, channel_id),
-            )
 
     # ── Word Frequency ────────────────────────
 
     async def increment_words(self, date: str, words: dict[str, int]) -> None:
-        for word, count in words.items():
-            existing = await self.db.fetch_one(
-                "SELECT id FROM word_frequency WHERE date = ? AND word = ?",
-                (date, word),
-            )
-            if existing is None:
-                await self.db.execute(
-                    "INSERT INTO word_frequency (date, word, count) VALUES (?, ?, ?)",
-                    (date, word, count),
-                )
-            else:
-                await self.db.execute(
-                    "UPDATE word_frequency SET count = count + ? WHERE date = ? AND word = ?",
-                    (count, date, word),
-                )
+        await self.db.execute_many(
+            "INSERT INTO word_frequency (date, word, count) VALUES (?, ?, ?) "
+            "ON CONFLICT(date, word) DO UPDATE SET count = word_frequency.count + excluded.count",
+            [(date, word, count) for word, count in words.items()],
+        )
 
     # ── Mention Tracking ──────────────────────
 
     async def increment_mentions(self, date: str, mentioned_ids: list[int]) -> None:
-        for mid in mentioned_ids:
-            existing = await self.db.fetch_one(
-                "SELECT id FROM mention_tracking WHERE date = ? AND mentioned_id = ?",
-                (date, mid),
-            )
-            if existing is None:
-                await self.db.execute(
-                    "INSERT INTO mention_tracking (date, mentioned_id, count) VALUES (?, ?, 1)",
-                    (date, mid),
-                )
-            else:
-                await self.db.execute(
-                    "UPDATE mention_tracking SET count = count + 1 WHERE date = ? AND mentioned_id = ?",
-                    (date, mid),
-                )
+        await self.db.execute_many(
+            "INSERT INTO mention_tracking (date, mentioned_id, count) VALUES (?, ?, ?) "
+            "ON CONFLICT(date, mentioned_id) DO UPDATE SET count = mention_tracking.count + excluded.count",
+            [(date, mid, count) for mid, count in Counter(mentioned_ids).items()],
+        )
 
     # ── Monthly Queries ───────────────────────
 
     async def get_monthly_top_messages(self, month: str, limit: int = 10) -> list[dict]:
         rows = await self.db.fetch_all(
             "SELECT user_id, SUM(messages_sent) as total FROM daily_stats "
-            "WHERE date LIKE ? GROUP BY user_id ORDER BY total DESC LIMIT ?",
-            (f"{month}%", limit),
+            "WHERE date >= ? AND date < ? GROUP BY user_id ORDER BY total DESC LIMIT ?",
+            (*_month_range(month), limit),
         )
         return [dict(r) for r in rows]
 
     async def get_monthly_top_voice(self, month: str, limit: int = 10) -> list[dict]:
         rows = await self.db.fetch_all(
             "SELECT user_id, SUM(vc_minutes) as total FROM daily_stats "
-            "WHERE date LIKE ? GROUP BY user_id ORDER BY total DESC LIMIT ?",
-            (f"{month}%", limit),
+            "WHERE date >= ? AND date < ? GROUP BY user_id ORDER BY total DESC LIMIT ?",
+            (*_month_range(month), limit),
         )
         return [dict(r) for r in rows]
 
     async def get_monthly_top_reactors(self, month: str, limit: int = 10) -> list[dict]:
         rows = await self.db.fetch_all(
             "SELECT user_id, SUM(reactions_given) as total FROM daily_stats "
-            "WHERE date LIKE ? GROUP BY user_id ORDER BY total DESC LIMIT ?",
-            (f"{month}%", limit),
+            "WHERE date >= ? AND date < ? GROUP BY user_id ORDER BY total DESC LIMIT ?",
+            (*_month_range(month), limit),
         )
         return [dict(r) for r in rows]
 
     async def get_monthly_most_mentioned(self, month: str, limit: int = 10) -> list[dict]:
         rows = await self.db.fetch_all(
             "SELECT mentioned_id as user_id, SUM(count) as total FROM mention_tracking "
-            "WHERE date LIKE ? GROUP BY mentioned_id ORDER BY total DESC LIMIT ?",
-            (f"{month}%", limit),
+            "WHERE date >= ? AND date < ? GROUP BY mentioned_id ORDER BY total DESC LIMIT ?",
+            (*_month_range(month), limit),
         )
         return [dict(r) for r in rows]
 
     async def get_monthly_most_edits(self, month: str, limit: int = 10) -> list[dict]:
         rows = await self.db.fetch_all(
             "SELECT user_id, SUM(edits) as total FROM daily_stats "
-            "WHERE date LIKE ? GROUP BY user_id ORDER BY total DESC LIMIT ?",
-            (f"{month}%", limit),
+            "WHERE date >= ? AND date < ? GROUP BY user_id ORDER BY total DESC LIMIT ?",
+            (*_month_range(month), limit),
         )
         return [dict(r) for r in rows]
 
     async def get_monthly_longest_message(self, month: str) -> dict | None:
         row = await self.db.fetch_one(
-            "SELECT user_id, char_count, message_id, channel_id FROM message_tracking "
-            "WHERE created_at LIKE ? ORDER BY char_count DESC LIMIT 1",
-            (f"{month}%",),
+            "SELECT longest_user_id as user_id, longest_char_count as char_count, "
+            "longest_message_id as message_id, longest_channel_id as channel_id "
+            "FROM message_monthly_summary WHERE month = ? AND longest_message_id IS NOT NULL",
+            (month,),
         )
+        if row is None:
+            row = await self.db.fetch_one(
+                "SELECT user_id, char_count, message_id, channel_id FROM message_tracking "
+                "WHERE created_at >= ? AND created_at < ? ORDER BY char_count DESC LIMIT 1",
+                _month_range(month),
+            )
         return dict(row) if row else None
 
     async def get_monthly_top_word(self, month: str, limit: int = 10) -> list[dict]:
         rows = await self.db.fetch_all(
             "SELECT word, SUM(count) as total FROM word_frequency "
-            "WHERE date LIKE ? GROUP BY word ORDER BY total DESC LIMIT ?",
-            (f"{month}%", limit),
+            "WHERE date >= ? AND date < ? GROUP BY word ORDER BY total DESC LIMIT ?",
+            (*_month_range(month), limit),
         )
         return [dict(r) for r in rows]
 
     async def get_monthly_most_reacted_image(self, month: str) -> dict | None:
         row = await self.db.fetch_one(
-            "SELECT message_id, user_id, channel_id, reaction_count FROM message_tracking "
-            "WHERE created_at LIKE ? AND has_attachment = 1 ORDER BY reaction_count DESC LIMIT 1",
-            (f"{month}%",),
+            "SELECT top_attachment_message_id as message_id, top_attachment_user_id as user_id, "
+            "top_attachment_channel_id as channel_id, top_attachment_reactions as reaction_count "
+            "FROM message_monthly_summary WHERE month = ? AND top_attachment_message_id IS NOT NULL",
+            (month,),
         )
+        if row is None:
+            row = await self.db.fetch_one(
+                "SELECT message_id, user_id, channel_id, reaction_count FROM message_tracking "
+                "WHERE created_at >= ? AND created_at < ? AND has_attachment = 1 ORDER BY reaction_count DESC LIMIT 1",
+                _month_range(month),
+            )
         return dict(row) if row else None
 
     async def get_monthly_top_channels(self, month: str, limit: int = 10) -> list[dict]:
         rows = await self.db.fetch_all(
-            "SELECT channel_id, SUM(message_count) as total FROM channel_stats "
-            "WHERE date LIKE ? GROUP BY channel_id ORDER BY total DESC LIMIT ?",
-            (f"{month}%", limit),
+            "SELECT channel_id, message_count as total FROM message_monthly_channels "
+            "WHERE month = ? ORDER BY message_count DESC LIMIT ?",
+            (month, limit),
         )
+        if not rows:
+            rows = await self.db.fetch_all(
+                "SELECT channel_id, SUM(message_count) as total FROM channel_stats "
+                "WHERE date >= ? AND date < ? GROUP BY channel_id ORDER BY total DESC LIMIT ?",
+                (*_month_range(month), limit),
+            )
         return [dict(r) for r in rows]
 
     async def get_active_days(self, month: str, user_id: int) -> int:
         count = await self.db.fetch_val(
             "SELECT COUNT(DISTINCT date) FROM daily_stats "
-            "WHERE date LIKE ? AND user_id = ? AND messages_sent > 0",
-            (f"{month}%", user_id),
+            "WHERE date >= ? AND date < ? AND user_id = ? AND messages_sent > 0",
+            (*_month_range(month), user_id),
         )
         return count or 0
 
     async def get_monthly_most_active_days(self, month: str, limit: int = 10) -> list[dict]:
         rows = await self.db.fetch_all(
             "SELECT user_id, COUNT(DISTINCT date) as total FROM daily_stats "
-            "WHERE date LIKE ? AND messages_sent > 0 GROUP BY user_id ORDER BY total DESC LIMIT ?",
-            (f"{month}%", limit),
+            "WHERE date >= ? AND date < ? AND messages_sent > 0 GROUP BY user_id ORDER BY total DESC LIMIT ?",
+            (*_month_range(month), limit),
         )
         return [dict(r) for r in rows]
 
@@ -246,24 +223,101 @@ class MonthlyStatsRepository:
             "SELECT SUM(messages_sent) as messages, SUM(vc_minutes) as voice, "
             "SUM(reactions_given) as reactions, SUM(edits) as edits, "
             "MAX(longest_message) as longest, COUNT(DISTINCT date) as active_days "
-            "FROM daily_stats WHERE date LIKE ? AND user_id = ?",
-            (f"{month}%", user_id),
+            "FROM daily_stats WHERE date >= ? AND date < ? AND user_id = ?",
+            (*_month_range(month), user_id),
         )
         return dict(row) if row else {}
 
+    # ── Rollup & Retention ────────────────────
+
+    async def get_oldest_tracked_month(self) -> str | None:
+        created_at = await self.db.fetch_val("SELECT MIN(created_at) FROM message_tracking")
+        return created_at[:7] if created_at else None
+
+    async def is_month_rolled_up(self, month: str) -> bool:
+        return await self.db.fetch_val(
+            "SELECT 1 FROM message_monthly_summary WHERE month = ?", (month,),
+        ) is not None
+
+    async def rollup_month(self, month: str) -> int:
+        """Summarise a closed month of message_tracking; returns the number of messages rolled up.
+
+        The summary keeps what the monthly report needs once the raw rows are
+        pruned: the longest message, the most-reacted attachment and
+        per-channel totals.
+        """
+        start, end = _month_range(month)
+        async with self.db.transaction():
+            totals = await self.db.fetch_one(
+                "SELECT COUNT(*) as messages, COALESCE(SUM(has_attachment), 0) as attachments "
+                "FROM message_tracking WHERE created_at >= ? AND created_at < ?",
+                (start, end),
+            )
+            if not totals["messages"]:
+                return 0
+            longest = await self.db.fetch_one(
+                "SELECT user_id, char_count, message_id, channel_id FROM message_tracking "
+                "WHERE created_at >= ? AND created_at < ? ORDER BY char_count DESC LIMIT 1",
+                (start, end),
+            )
+            top = await self.db.fetch_one(
+                "SELECT message_id, user_id, channel_id, reaction_count FROM message_tracking "
+                "WHERE created_at >= ? AND created_at < ? AND has_attachment = 1 "
+                "ORDER BY reaction_count DESC LIMIT 1",
+                (start, end),
+            ) or {}
+            await self.db.execute(
+                "INSERT INTO message_monthly_summary (month, message_count, attachment_count, "
+                "longest_message_id, longest_user_id, longest_channel_id, longest_char_count, "
+                "top_attachment_message_id, top_attachment_user_id, top_attachment_channel_id, "
+                "top_attachment_reactions) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(month) DO NOTHING",
+                (
+                    month, totals["messages"], totals["attachments"],
+                    longest["message_id"], longest["user_id"], longest["channel_id"], longest["char_count"],
+                    top.get("message_id"), top.get("user_id"), top.get("channel_id"),
+                    top.get("reaction_count", 0),
+                ),
+            )
+            await self.db.execute(
+                "INSERT INTO message_monthly_channels (month, channel_id, message_count, char_count, reaction_count) "
+                "SELECT ?, channel_id, COUNT(*), SUM(char_count), SUM(reaction_count) FROM message_tracking "
+                "WHERE created_at >= ? AND created_at < ? GROUP BY channel_id "
+                "ON CONFLICT(month, channel_id) DO NOTHING",
+                (month, start, end),
+            )
+        return totals["messages"]
+
+    async def prune_tracked_messages(self, before: str, batch_size: int) -> int:
+        """Delete up to ``batch_size`` message_tracking rows created before ``before``; returns how many."""
+        rows = await self.db.fetch_all(
+            "DELETE FROM message_tracking WHERE id IN ("
+            "SELECT id FROM message_tracking WHERE created_at < ? ORDER BY created_at LIMIT ?"
+            ") RETURNING id",
+            (before, batch_size),
+        )
+        return len(rows)
+
+    async def prune_channel_stats(self, before: str) -> int:
+        """Delete channel_stats days before ``before`` whose month is rolled up; returns how many."""
+        rows = await self.db.fetch_all(
+            "DELETE FROM channel_stats WHERE date < ? "
+            "AND substr(date, 1, 7) IN (SELECT month FROM message_monthly_summary) RETURNING date",
+            (before,),
+        )
+        return len(rows)
+
     # ── Monthly Reports ───────────────────────
 
     async def save_report(self, month: str, report_data: dict, message_id: int | None = None,
                           channel_id: int | None = None) -> int:
-        await self.db.execute(
+        return await self.db.insert_returning(
             "INSERT INTO monthly_reports (month, report_data, message_id, channel_id) VALUES (?, ?, ?, ?)",
             (month, json.dumps(report_data), message_id, channel_id),
         )
-        return await self.db.fetch_val("SELECT last_insert_rowid()")
 
     async def get_report(self, month: str) -> MonthlyReport | None:
-        row = await self.db.fetch_one(
+        return await self.db.fetch_model(
             "SELECT * FROM monthly_reports WHERE month = ? ORDER BY created_at DESC LIMIT 1",
-            (month,),
+            (month,), MonthlyReport,
         )
-        return MonthlyReport(**row) if row else None
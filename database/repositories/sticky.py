@@ -19,8 +19,7 @@ class StickyRepository:
             INSERT INTO sticky_messages (channel_id, message_id, embed_type)
             VALUES (?, ?, ?)
         """
-        await self.db.execute(query, (channel_id, message_id, embed_type))
-        return await self.db.fetch_val("SELECT last_insert_rowid()")
+        return await self.db.insert_returning(query, (channel_id, message_id, embed_type))
 
     async def get_by_channel(self, channel_id: int) -> dict | None:
         """Get sticky message for a channel"""
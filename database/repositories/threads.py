@@ -13,10 +13,9 @@ class ThreadRepository:
         self.db = db
 
     async def get(self, channel_id: int) -> AutoThreadConfig | None:
-        row = await self.db.fetch_one(
-            "SELECT * FROM auto_thread_configs WHERE channel_id = ?", (channel_id,),
+        return await self.db.fetch_model(
+            "SELECT * FROM auto_thread_configs WHERE channel_id = ?", (channel_id,), AutoThreadConfig,
         )
-        return AutoThreadConfig(**row) if row else None
 
     async def upsert(self, channel_id: int, **kwargs) -> None:
         existing = await self.get(channel_id)
@@ -49,11 +48,10 @@ class ThreadRepository:
         return True
 
     async def list_enabled(self) -> list[AutoThreadConfig]:
-        rows = await self.db.fetch_all(
+        return await self.db.fetch_models(
             "SELECT * FROM auto_thread_configs WHERE enabled = 1",
+            (), AutoThreadConfig,
         )
-        return [AutoThreadConfig(**r) for r in rows]
 
     async def list_all(self) -> list[AutoThreadConfig]:
-        rows = await self.db.fetch_all("SELECT * FROM auto_thread_configs ORDER BY channel_id")
-        return [AutoThreadConfig(**r) for r in rows]
+        return await self.db.fetch_models("SELECT * FROM auto_thread_configs ORDER BY channel_id", (), AutoThreadConfig)
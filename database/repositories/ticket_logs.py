@@ -20,16 +20,14 @@ class TicketLogRepository:
         )
 
     async def get_for_ticket(self, ticket_id: int) -> list[TicketLog]:
-        rows = await self.db.fetch_all(
+        return await self.db.fetch_models(
             "SELECT * FROM ticket_logs WHERE ticket_id = ? ORDER BY created_at ASC",
-            (ticket_id,),
+            (ticket_id,), TicketLog,
         )
-        return [TicketLog(**r) for r in rows]
 
     async def get_latest_event(self, ticket_id: int, event: str) -> TicketLog | None:
-        row = await self.db.fetch_one(
+        return await self.db.fetch_model(
             "SELECT * FROM ticket_logs WHERE ticket_id = ? AND event = ? "
             "ORDER BY created_at DESC LIMIT 1",
-            (ticket_id, event),
+            (ticket_id, event), TicketLog,
         )
-        return TicketLog(**row) if row else None
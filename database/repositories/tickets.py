@@ -14,34 +14,29 @@ class TicketRepository:
 
     async def create(self, channel_id: int, ticket_type: str, owner_id: int,
                      opener_id: int, reason: str | None = None) -> int:
-        await self.db.execute(
+        return await self.db.insert_returning(
             "INSERT INTO tickets (channel_id, ticket_type, owner_id, opener_id, reason) "
             "VALUES (?, ?, ?, ?, ?)",
             (channel_id, ticket_type, owner_id, opener_id, reason),
         )
-        row_id = await self.db.fetch_val("SELECT last_insert_rowid()")
-        return row_id
 
     async def get(self, ticket_id: int) -> Ticket | None:
-        row = await self.db.fetch_one("SELECT * FROM tickets WHERE id = ?", (ticket_id,))
-        return Ticket(**row) if row else None
+        return await self.db.fetch_model("SELECT * FROM tickets WHERE id = ?", (ticket_id,), Ticket)
 
     async def get_by_channel(self, channel_id: int) -> Ticket | None:
-        row = await self.db.fetch_one("SELECT * FROM tickets WHERE channel_id = ?", (channel_id,))
-        return Ticket(**row) if row else None
+        return await self.db.fetch_model("SELECT * FROM tickets WHERE channel_id = ?", (channel_id,), Ticket)
 
     async def get_open_for_user(self, user_id: int) -> Ticket | None:
-        row = await self.db.fetch_one(
+        return await self.db.fetch_model(
             "SELECT * FROM tickets WHERE owner_id = ? AND status IN ('open', 'claimed') LIMIT 1",
-            (user_id,),
+            (user_id,), Ticket,
         )
-        return Ticket(**row) if row else None
 
     async def get_open_tickets(self) -> list[Ticket]:
-        rows = await self.db.fetch_all(
+        return await self.db.fetch_models(
             "SELECT * FROM tickets WHERE status IN ('open', 'claimed') ORDER BY created_at ASC",
+            (), Ticket,
         )
-        return [Ticket(**r) for r in rows]
 
     async def claim(self, ticket_id: int, staff_id: int) -> None:
         await self.db.execute(
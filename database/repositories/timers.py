@@ -13,23 +13,21 @@ class TimerRepository:
         self.db = db
 
     async def create(self, timer_type: str, fires_at: str, payload: str | None = None) -> int:
-        await self.db.execute(
+        return await self.db.insert_returning(
             "INSERT INTO timers (timer_type, fires_at, payload) VALUES (?, ?, ?)",
             (timer_type, fires_at, payload),
         )
-        return await self.db.fetch_val("SELECT last_insert_rowid()")
 
     async def get(self, timer_id: int) -> Timer | None:
-        row = await self.db.fetch_one("SELECT * FROM timers WHERE id = ?", (timer_id,))
-        return Timer(**row) if row else None
+        return await self.db.fetch_model("SELECT * FROM timers WHERE id = ?", (timer_id,), Timer)
 
     async def get_pending(self) -> list[Timer]:
         """Get all timers that should fire now or are overdue."""
-        rows = await self.db.fetch_all(
+        return await self.db.fetch_models(
             "SELECT * FROM timers WHERE fired = 0 AND cancelled = 0 "
             "AND fires_at <= datetime('now') ORDER BY fires_at ASC",
+            (), Timer,
         )
-        return [Timer(**r) for r in rows]
 
     async def mark_fired(self, timer_id: int) -> None:
         await self.db.execute(
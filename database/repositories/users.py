@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable
 
 from database.models import User
 
@@ -8,33 +11,260 @@ if TYPE_CHECKING:
     from database.engine import DatabaseEngine
 
 
+class UserCache:
+    """Bounded LRU + TTL cache of user rows, shared by every UserRepository.
+
+    Entries (including "no such user") expire after ``ttl_seconds`` and the
+    least recently used one is dropped past ``max_size``. The repository
+    invalidates a user once each write to their row commits; a read that
+    raced with that invalidation is not stored, so the cache never holds a
+    row older than the latest commit. Reads inside a transaction bypass it.
+    Cached ``User`` objects are shared — treat them as read-only.
+    """
+
+    def __init__(self, settings: dict[str, Any] | None = None):
+        self._rows: OrderedDict[int, tuple[float, User | None]] = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.configure(settings or {})
+
+    def configure(self, settings: dict[str, Any]) -> None:
+        """(Re)apply ``database.user_cache`` settings; disabling drops every entry."""
+        self.enabled = settings.get("enabled", True)
+        self.max_size = settings.get("max_size", 10_000)
+        self.ttl = settings.get("ttl_seconds", 300)
+        if not self.enabled:
+            self._rows.clear()
+        while len(self._rows) > self.max_size:
+            self._rows.popitem(last=False)
+
+    @property
+    def generation(self) -> int:
+        """Changes on every invalidation; pass the value seen before a read to ``put``."""
+        return self._generation
+
+    def lookup(self, user_id: int) -> tuple[bool, User | None]:
+        """``(True, row)`` on a fresh hit, ``(False, None)`` otherwise."""
+        if not self.enabled:
+            return False, None
+        entry = self._rows.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._rows[user_id]
+            self.misses += 1
+            return False, None
+        self._rows.move_to_end(user_id)
+        self.hits += 1
+        return True, entry[1]
+
+    def put(self, user_id: int, user: User | None, generation: int) -> None:
+        if not self.enabled or generation != self._generation:
+            return
+        self._rows[user_id] = (time.monotonic() + self.ttl, user)
+        self._rows.move_to_end(user_id)
+        if len(self._rows) > self.max_size:
+            self._rows.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        self._generation += 1
+        self.invalidations += 1
+        self._rows.pop(user_id, None)
+
+    def invalidate_many(self, user_ids: list[int]) -> None:
+        self._generation += 1
+        self.invalidations += len(user_ids)
+        for user_id in user_ids:
+            self._rows.pop(user_id, None)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "size": len(self._rows),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+        }
+
+
+class RankIndex:
+    """Approved users' total_xp kept in leaderboard order, shared by every UserRepository.
+
+    A sorted list of ``(-total_xp, user_id)`` answers rank, top-N and
+    neighbour lookups with a bisect; XP changes move one entry. Loaded once
+    at startup and kept current by the repository's XP and status writes,
+    each applied once it commits.
+    Until it is loaded the repository falls back to SQL.
+    """
+
+    def __init__(self) -> None:
+        self._keys: list[tuple[int, int]] = []
+        self._xp: dict[int, int] = {}
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def load(self, rows: list[tuple[int, int]]) -> None:
+        """Replace the contents with ``(user_id, total_xp)`` rows."""
+        self._xp = dict(rows)
+        self._keys = sorted((-xp, user_id) for user_id, xp in self._xp.items())
+        self.loaded = True
+
+    def xp_of(self, user_id: int) -> int | None:
+        return self._xp.get(user_id)
+
+    def set(self, user_id: int, total_xp: int) -> None:
+        old = self._xp.get(user_id)
+        if old == total_xp:
+            return
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (-old, user_id))]
+        self._xp[user_id] = total_xp
+        insort(self._keys, (-total_xp, user_id))
+
+    def add(self, user_id: int, amount: int) -> None:
+        """Apply an XP delta; users not in the index (not approved) are ignored."""
+        old = self._xp.get(user_id)
+        if old is not None:
+            self.set(user_id, old + amount)
+
+    def remove(self, user_id: int) -> None:
+        old = self._xp.pop(user_id, None)
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (-old, user_id))]
+
+    def rank_for_xp(self, total_xp: int) -> int:
+        """1 + the number of approved users with more XP (ties share a rank)."""
+        return bisect_left(self._keys, (-total_xp,)) + 1
+
+    def top(self, limit: int) -> list[int]:
+        return [user_id for _, user_id in self._keys[:limit]]
+
+    def around(self, user_id: int, radius: int = 2) -> list[tuple[int, int]]:
+        """``(rank, user_id)`` for up to ``radius`` users either side of ``user_id``, itself included."""
+        xp = self._xp.get(user_id)
+        if xp is None:
+            return []
+        pos = bisect_left(self._keys, (-xp, user_id))
+        window = self._keys[max(0, pos - radius):pos + radius + 1]
+        return [(self.rank_for_xp(-neg_xp), uid) for neg_xp, uid in window]
+
+
 class UserRepository:
-    def __init__(self, db: DatabaseEngine):
+    def __init__(self, db: DatabaseEngine, cache: UserCache | None = None,
+                 ranks: RankIndex | None = None):
         self.db = db
+        self.cache = cache
+        self.ranks = ranks
 
     async def get(self, user_id: int) -> User | None:
-        row = await self.db.fetch_one("SELECT * FROM users WHERE user_id = ?", (user_id,))
-        return User(**row) if row else None
+        # Inside a transaction the row may carry this task's uncommitted writes
+        if self.cache is None or self.db.in_transaction():
+            return await self.db.fetch_model("SELECT * FROM users WHERE user_id = ?", (user_id,), User)
+        hit, user = self.cache.lookup(user_id)
+        if hit:
+            return user
+        generation = self.cache.generation
+        user = await self.db.fetch_model("SELECT * FROM users WHERE user_id = ?", (user_id,), User)
+        self.cache.put(user_id, user, generation)
+        return user
 
-    async def upsert(self, user_id: int, **kwargs: Any) -> None:
-        existing = await self.get(user_id)
-        if existing is None:
-            cols = ["user_id"] + list(kwargs.keys())
-            placeholders = ", ".join("?" for _ in cols)
-            vals = [user_id] + list(kwargs.values())
-            await self.db.execute(
-                f"INSERT INTO users ({', '.join(cols)}) VALUES ({placeholders})",
-                tuple(vals),
+    async def get_many(self, user_ids: list[int]) -> list[User]:
+        """Users in the order given, skipping unknown ids; cache misses are fetched in one query."""
+        found: dict[int, User | None] = {}
+        missing = []
+        cache = None if self.db.in_transaction() else self.cache
+        for user_id in user_ids:
+            hit, user = cache.lookup(user_id) if cache is not None else (False, None)
+            if hit:
+                found[user_id] = user
+            else:
+                missing.append(user_id)
+        if missing:
+            generation = cache.generation if cache is not None else 0
+            placeholders = ", ".join("?" for _ in missing)
+            rows = await self.db.fetch_models(
+                f"SELECT * FROM users WHERE user_id IN ({placeholders})", tuple(missing), User,
             )
+            for user in rows:
+                found[user.user_id] = user
+                if cache is not None:
+                    cache.put(user.user_id, user, generation)
+        return [user for user_id in user_ids if (user := found.get(user_id)) is not None]
+
+    async def get_xp_many(self, user_ids: list[int]) -> dict[int, tuple[int, int]]:
+        """user_id -> (total_xp, level) for the ids that exist; bypasses the cache for bulk jobs."""
+        if not user_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in user_ids)
+        rows = await self.db.fetch_all(
+            f"SELECT user_id, total_xp, level FROM users WHERE user_id IN ({placeholders})",
+            tuple(user_ids),
+        )
+        return {r["user_id"]: (r["total_xp"], r["level"]) for r in rows}
+
+    def _invalidate(self, *user_ids: int) -> None:
+        """Drop users from the cache once the current write commits (now, outside a transaction)."""
+        if self.cache is not None:
+            self.db.after_commit(lambda: self.cache.invalidate_many(list(user_ids)))
+
+    def _update_ranks(self, change: Callable[[RankIndex], None]) -> None:
+        """Apply ``change`` to the rank index once the current write commits, so a rollback leaves it alone."""
+        if self.ranks is not None:
+            self.db.after_commit(lambda: change(self.ranks))
+
+    @staticmethod
+    def _set_ranked(ranks: RankIndex, totals: list[tuple[int, int]]) -> None:
+        """Move users who are already ranked to their new ``(user_id, total_xp)``."""
+        for user_id, total_xp in totals:
+            if ranks.xp_of(user_id) is not None:
+                ranks.set(user_id, total_xp)
+
+    @staticmethod
+    def _add_ranked(ranks: RankIndex, deltas: list[tuple[int, int]]) -> None:
+        for user_id, amount in deltas:
+            ranks.add(user_id, amount)
+
+    async def _sync_rank(self, user_id: int) -> None:
+        """Re-read a user whose status may have changed and add or drop them from the rank index."""
+        if self.ranks is None:
+            return
+        user = await self.get(user_id)
+        if user is not None and user.status == "approved":
+            self._update_ranks(lambda ranks: ranks.set(user_id, user.total_xp))
         else:
-            if not kwargs:
-                return
-            sets = ", ".join(f"{k} = ?" for k in kwargs)
-            vals = list(kwargs.values()) + [user_id]
-            await self.db.execute(
-                f"UPDATE users SET {sets}, updated_at = datetime('now') WHERE user_id = ?",
-                tuple(vals),
-            )
+            self._update_ranks(lambda ranks: ranks.remove(user_id))
+
+    async def load_rank_index(self) -> int:
+        rows = await self.db.fetch_all(
+            "SELECT user_id, total_xp FROM users WHERE status = 'approved'",
+        )
+        self.ranks.load([(r["user_id"], r["total_xp"]) for r in rows])
+        return len(rows)
+
+    async def upsert(self, user_id: int, **kwargs: Any) -> None:
+        cols = ["user_id"] + list(kwargs.keys())
+        placeholders = ", ".join("?" for _ in cols)
+        vals = [user_id] + list(kwargs.values())
+        if kwargs:
+            sets = ", ".join(f"{k} = excluded.{k}" for k in kwargs)
+            conflict = f"DO UPDATE SET {sets}, updated_at = datetime('now')"
+        else:
+            conflict = "DO NOTHING"
+        await self.db.execute(
+            f"INSERT INTO users ({', '.join(cols)}) VALUES ({placeholders}) "
+            f"ON CONFLICT(user_id) {conflict}",
+            tuple(vals),
+        )
+        self._invalidate(user_id)
+        if "status" in kwargs:
+            await self._sync_rank(user_id)
 
     async def set_rules_agreed(self, user_id: int, version: str, method: str) -> None:
         await self.upsert(user_id)
@@ -44,18 +274,22 @@ class UserRepository:
             "WHERE user_id = ?",
             (version, method, user_id),
         )
+        self._invalidate(user_id)
 
     async def set_intro_status(self, user_id: int, status: str) -> None:
         await self.db.execute(
             "UPDATE users SET intro_status = ?, updated_at = datetime('now') WHERE user_id = ?",
             (status, user_id),
         )
+        self._invalidate(user_id)
 
     async def set_status(self, user_id: int, status: str) -> None:
         await self.db.execute(
             "UPDATE users SET status = ?, updated_at = datetime('now') WHERE user_id = ?",
             (status, user_id),
         )
+        self._invalidate(user_id)
+        await self._sync_rank(user_id)
 
     async def add_xp(self, user_id: int, amount: int, new_level: int) -> None:
         await self.db.execute(
@@ -63,24 +297,81 @@ class UserRepository:
             "updated_at = datetime('now') WHERE user_id = ?",
             (amount, new_level, user_id),
         )
+        self._invalidate(user_id)
+        self._update_ranks(lambda ranks: ranks.add(user_id, amount))
 
     async def set_xp(self, user_id: int, total_xp: int, level: int) -> None:
         await self.db.execute(
             "UPDATE users SET total_xp = ?, level = ?, updated_at = datetime('now') WHERE user_id = ?",
             (total_xp, level, user_id),
         )
+        self._invalidate(user_id)
+        self._update_ranks(lambda ranks: self._set_ranked(ranks, [(user_id, total_xp)]))
+
+    async def bulk_set_xp(self, rows: list[tuple[int, int, int]]) -> None:
+        """Create-or-update (user_id, total_xp, level) for many users at once."""
+        await self.db.execute_many(
+            "INSERT INTO users (user_id, total_xp, level) VALUES (?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET total_xp = excluded.total_xp, "
+            "level = excluded.level, updated_at = datetime('now')",
+            rows,
+        )
+        self._invalidate(*(row[0] for row in rows))
+        totals = [(user_id, total_xp) for user_id, total_xp, _ in rows]
+        self._update_ranks(lambda ranks: self._set_ranked(ranks, totals))
+
+    async def apply_xp_batch(self, rows: list[tuple[int, int, int, int, int]]) -> None:
+        """Add buffered awards for many users at once: (user_id, xp, new_level, messages, vc_minutes)."""
+        await self.db.execute_many(
+            "INSERT INTO users (user_id, total_xp, level, messages_sent, vc_minutes) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET total_xp = users.total_xp + excluded.total_xp, "
+            "level = excluded.level, messages_sent = users.messages_sent + excluded.messages_sent, "
+            "vc_minutes = users.vc_minutes + excluded.vc_minutes, updated_at = datetime('now')",
+            rows,
+        )
+        self._invalidate(*(row[0] for row in rows))
+        deltas = [(user_id, xp) for user_id, xp, *_ in rows]
+        self._update_ranks(lambda ranks: self._add_ranked(ranks, deltas))
+
+    async def set_levels(self, rows: list[tuple[int, int]]) -> None:
+        """Correct stored levels: (level, user_id)."""
+        await self.db.execute_many("UPDATE users SET level = ? WHERE user_id = ?", rows)
+        self._invalidate(*(user_id for _, user_id in rows))
+
+    async def reconcile_xp(self, rows: list[tuple[int, int, int, int]]) -> int:
+        """Replace drifted totals: (total_xp, level, user_id, expected_total).
+
+        A row only applies while the stored total still equals
+        ``expected_total``, so XP written since it was read is never
+        overwritten. Returns how many rows applied.
+        """
+        await self.db.execute_many(
+            "UPDATE users SET total_xp = ?, level = ?, updated_at = datetime('now') "
+            "WHERE user_id = ? AND total_xp = ?",
+            rows,
+        )
+        user_ids = [row[2] for row in rows]
+        self._invalidate(*user_ids)
+        stored: dict[int, tuple[int, int]] = {}
+        for i in range(0, len(user_ids), 500):
+            stored.update(await self.get_xp_many(user_ids[i:i + 500]))
+        totals = [(user_id, total_xp) for user_id, (total_xp, _) in stored.items()]
+        self._update_ranks(lambda ranks: self._set_ranked(ranks, totals))
+        return sum(stored.get(user_id, (None,))[0] == total_xp for total_xp, _, user_id, _ in rows)
 
     async def increment_messages(self, user_id: int) -> None:
         await self.db.execute(
             "UPDATE users SET messages_sent = messages_sent + 1, updated_at = datetime('now') WHERE user_id = ?",
             (user_id,),
         )
+        self._invalidate(user_id)
 
     async def add_vc_minutes(self, user_id: int, minutes: int) -> None:
         await self.db.execute(
             "UPDATE users SET vc_minutes = vc_minutes + ?, updated_at = datetime('now') WHERE user_id = ?",
             (minutes, user_id),
         )
+        self._invalidate(user_id)
 
     async def set_age_verified(self, user_id: int) -> None:
         await self.db.execute(
@@ -88,15 +379,35 @@ class UserRepository:
             "updated_at = datetime('now') WHERE user_id = ?",
             (user_id,),
         )
+        self._invalidate(user_id)
 
     async def get_leaderboard(self, limit: int = 10) -> list[User]:
-        rows = await self.db.fetch_all(
+        if self.ranks is not None and self.ranks.loaded:
+            return await self.get_many(self.ranks.top(limit))
+        return await self.db.fetch_models(
             "SELECT * FROM users WHERE status = 'approved' ORDER BY total_xp DESC LIMIT ?",
-            (limit,),
+            (limit,), User,
         )
-        return [User(**r) for r in rows]
+
+    async def get_neighbours(self, user_id: int, radius: int = 2) -> list[tuple[int, User]]:
+        """``(rank, user)`` for the approved users just above and below ``user_id`` (rank index only)."""
+        if self.ranks is None or not self.ranks.loaded:
+            return []
+        window = self.ranks.around(user_id, radius)
+        users = {u.user_id: u for u in await self.get_many([uid for _, uid in window])}
+        return [(rank, users[uid]) for rank, uid in window if uid in users]
 
     async def get_rank(self, user_id: int) -> int | None:
+        """1 + the approved users with more XP; a user without a row counts nobody above them (1)."""
+        if self.ranks is not None and self.ranks.loaded:
+            total_xp = self.ranks.xp_of(user_id)
+            if total_xp is None:
+                user = await self.get(user_id)
+                if user is None:
+                    # Same answer as the SQL below, whose subquery finds no row
+                    return 1
+                total_xp = user.total_xp
+            return self.ranks.rank_for_xp(total_xp)
         row = await self.db.fetch_val(
             "SELECT COUNT(*) + 1 FROM users "
             "WHERE status = 'approved' AND total_xp > "
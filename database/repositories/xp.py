@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from datetime import date, timedelta
 from typing import TYPE_CHECKING
 
+from core.errors import DatabaseError
 from database.models import XPEntry
 
 if TYPE_CHECKING:
@@ -13,19 +15,16 @@ class XPRepository:
         self.db = db
 
     async def add(self, user_id: int, amount: int, source: str, details: str | None = None) -> int:
-        await self.db.execute(
+        return await self.db.insert_returning(
             "INSERT INTO xp_history (user_id, amount, source, details) VALUES (?, ?, ?, ?)",
             (user_id, amount, source, details),
         )
-        row_id = await self.db.fetch_val("SELECT last_insert_rowid()")
-        return row_id
 
     async def get_history(self, user_id: int, limit: int = 50) -> list[XPEntry]:
-        rows = await self.db.fetch_all(
+        return await self.db.fetch_models(
             "SELECT * FROM xp_history WHERE user_id = ? ORDER BY created_at DESC LIMIT ?",
-            (user_id, limit),
+            (user_id, limit), XPEntry,
         )
-        return [XPEntry(**r) for r in rows]
 
     async def get_total_by_source(self, user_id: int) -> dict[str, int]:
         rows = await self.db.fetch_all(
@@ -43,11 +42,93 @@ class XPRepository:
         return count or 0
 
     async def bulk_import(self, entries: list[tuple[int, int, str, str | None]]) -> int:
-        count = 0
-        for user_id, amount, source, details in entries:
+        return await self.db.bulk_copy(
+            "xp_history", ("user_id", "amount", "source", "details"), entries,
+        )
+
+    async def get_history_totals(self) -> list[tuple[int, int, int, int]]:
+        """(user_id, total_xp, level, history_xp) for every user, summing xp_history in one grouped pass."""
+        rows = await self.db.fetch_all(
+            "SELECT u.user_id, u.total_xp, u.level, COALESCE(h.total, 0) as history_xp FROM users u "
+            "LEFT JOIN (SELECT user_id, SUM(amount) as total FROM xp_history GROUP BY user_id) h "
+            "ON h.user_id = u.user_id",
+        )
+        return [(r["user_id"], r["total_xp"], r["level"], r["history_xp"]) for r in rows]
+
+    # ── Compaction ────────────────────────────
+
+    async def get_next_compaction_day(self) -> str | None:
+        """First day not compacted yet: the day after the last compacted one, or the oldest row's day."""
+        last = await self.db.fetch_val("SELECT MAX(day) FROM xp_compaction")
+        if last:
+            return (date.fromisoformat(last) + timedelta(days=1)).isoformat()
+        oldest = await self.db.fetch_val("SELECT MIN(created_at) FROM xp_history")
+        return oldest[:10] if oldest else None
+
+    async def get_day(self, day: str) -> list[XPEntry]:
+        """Raw xp_history rows for one day, oldest first."""
+        end = (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+        return await self.db.fetch_models(
+            "SELECT * FROM xp_history WHERE created_at >= ? AND created_at < ? ORDER BY id",
+            (day, end), XPEntry,
+        )
+
+    async def compact_day(self, day: str, archived: list[XPEntry] | None = None) -> tuple[int, int]:
+        """Merge one day of xp_history into one row per (user, source).
+
+        Each merged row carries the summed amount, so every user's history
+        still adds up to the same total and users.total_xp needs no change;
+        the day's total is checked before committing. ``archived`` is the
+        day's rows as already written to an archive (see ``get_day``): only
+        those rows are merged, and if the day no longer matches them the
+        transaction is rolled back. Returns (raw_rows, compacted_rows).
+        """
+        start = f"{day} 00:00:00"
+        end = (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+        async with self.db.transaction():
+            if archived is None:
+                max_id = await self.db.fetch_val(
+                    "SELECT MAX(id) FROM xp_history WHERE created_at >= ? AND created_at < ?",
+                    (day, end),
+                )
+            else:
+                max_id = archived[-1].id if archived else None
+            before = await self.db.fetch_one(
+                "SELECT COUNT(*) as rows, COALESCE(SUM(amount), 0) as total "
+                "FROM xp_history WHERE created_at >= ? AND created_at < ? AND id <= ?",
+                (day, end, max_id or 0),
+            )
+            if archived is not None and (
+                before["rows"] != len(archived) or before["total"] != sum(r.amount for r in archived)
+            ):
+                raise DatabaseError(f"xp_history for {day} changed after it was archived")
+            compacted = 0
+            if before["rows"]:
+                last_id = await self.db.fetch_val("SELECT MAX(id) FROM xp_history")
+                await self.db.execute(
+                    "INSERT INTO xp_history (user_id, amount, source, details, created_at) "
+                    "SELECT user_id, SUM(amount), source, 'compacted:' || COUNT(*), ? FROM xp_history "
+                    "WHERE created_at >= ? AND created_at < ? AND id <= ? GROUP BY user_id, source",
+                    (start, day, end, max_id),
+                )
+                await self.db.execute(
+                    "DELETE FROM xp_history WHERE created_at >= ? AND created_at < ? AND id <= ?",
+                    (day, end, max_id),
+                )
+                # The merged rows are the ones just inserted, past every existing id
+                after = await self.db.fetch_one(
+                    "SELECT COUNT(*) as rows, COALESCE(SUM(amount), 0) as total "
+                    "FROM xp_history WHERE created_at >= ? AND created_at < ? AND id > ?",
+                    (day, end, last_id),
+                )
+                if after["total"] != before["total"]:
+                    raise DatabaseError(
+                        f"xp_history compaction for {day} changed the total "
+                        f"({before['total']} -> {after['total']})"
+                    )
+                compacted = after["rows"]
             await self.db.execute(
-                "INSERT INTO xp_history (user_id, amount, source, details) VALUES (?, ?, ?, ?)",
-                (user_id, amount, source, details),
+                "INSERT INTO xp_compaction (day, raw_rows, compacted_rows) VALUES (?, ?, ?)",
+                (day, before["rows"], compacted),
             )
-            count += 1
-        return count
+        return before["rows"], compacted
@@ -0,0 +1,114 @@
+"""Statement-count check for the single-statement repository writes.
+
+Runs each upsert / increment method against a scratch SQLite database
+built by the normal migrations, wrapped in InstrumentedEngine, and counts
+the statements it sends. Every method is called twice — the first call
+creates the row where it can, the repeat takes the ON CONFLICT path; for
+revoke, the first call deletes the row and the repeat finds none — and
+must issue exactly one statement each time. ``execute_many`` counts as one.
+
+    python -m database.statement_counts        # failures only
+    python -m database.statement_counts -v     # every call
+
+Exits non-zero when a method issues more than one statement.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from database.engine import create_engine
+from database.instrumentation import InstrumentedEngine
+from database.migrations.migrate import run_migrations
+from database.repositories.achievements import AchievementRepository
+from database.repositories.monthly_stats import MonthlyStatsRepository
+from database.repositories.users import UserRepository
+
+_DAY = "2025-06-01"
+
+
+@dataclass(slots=True)
+class CallCount:
+    name: str
+    attempt: str
+    statements: list[str]
+
+    @property
+    def ok(self) -> bool:
+        return len(self.statements) == 1
+
+
+def _cases(db: InstrumentedEngine, achievement_id: int) -> list[tuple[str, Callable[[], Awaitable[Any]]]]:
+    # No cache or rank index: those add reads of their own on top of the write
+    users = UserRepository(db)
+    stats = MonthlyStatsRepository(db)
+    achievements = AchievementRepository(db)
+    return [
+        ("UserRepository.upsert", lambda: users.upsert(2)),
+        ("UserRepository.upsert(**kwargs)", lambda: users.upsert(3, username="someone")),
+        ("UserRepository.increment_messages", lambda: users.increment_messages(1)),
+        ("MonthlyStatsRepository.upsert_daily",
+         lambda: stats.upsert_daily(_DAY, 1, messages_sent=1, longest_message=40)),
+        ("MonthlyStatsRepository.increment_daily",
+         lambda: stats.increment_daily(_DAY, 1, "reactions_given")),
+        ("MonthlyStatsRepository.update_longest_message",
+         lambda: stats.update_longest_message(_DAY, 1, 120)),
+        ("MonthlyStatsRepository.increment_channel", lambda: stats.increment_channel(_DAY, 10, 1, 3)),
+        ("MonthlyStatsRepository.increment_words",
+         lambda: stats.increment_words(_DAY, {"hello": 2, "there": 1})),
+        ("MonthlyStatsRepository.increment_mentions", lambda: stats.increment_mentions(_DAY, [4, 4, 5])),
+        ("AchievementRepository.unlock", lambda: achievements.unlock(1, achievement_id)),
+        # Runs after unlock, so the first call has a row to delete
+        ("AchievementRepository.revoke", lambda: achievements.revoke(1, achievement_id)),
+    ]
+
+
+async def count_statements() -> list[CallCount]:
+    results: list[CallCount] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db = InstrumentedEngine(await create_engine(f"sqlite:///{tmp}/counts.db"))
+        try:
+            await run_migrations(db)
+            await db.execute("INSERT INTO users (user_id) VALUES (1)")
+            achievement_id = await AchievementRepository(db).create(
+                "statement_counts", "Check", "Statement count check", "messages", 1,
+            )
+            for name, call in _cases(db, achievement_id):
+                for attempt in ("first call", "repeat"):
+                    db.reset_stats()
+                    await call()
+                    statements = [
+                        q["sql"] for q in db.query_stats(limit=1000) for _ in range(q["count"])
+                    ]
+                    results.append(CallCount(name, attempt, statements))
+        finally:
+            await db.close()
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every call")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(count_statements())
+    failures = 0
+    for result in results:
+        failures += not result.ok
+        if args.verbose or not result.ok:
+            marker = "ok" if result.ok else "FAIL"
+            print(f"[{marker}] {result.name} ({result.attempt}): {len(result.statements)} statement(s)")
+            if not result.ok:
+                for sql in result.statements:
+                    print(f"    {sql}")
+
+    print(f"{len(results)} calls checked, {failures} failing")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Check that a failed XP flush leaves the rank index and user cache untouched.
+
+    python -m database.xp_flush_check
+
+Runs the write XPCog._flush_xp makes against a scratch SQLite database:
+one transaction holding UserRepository.apply_xp_batch and the xp_history
+batch. The first attempt fails part-way through and rolls back. The same
+batch is then retried, as the re-queued awards would be on the next flush.
+Another task reads the users while each attempt is open. Afterwards every
+user's rank-index entry and cached row must match the stored total_xp.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+
+from core.constants import XPSource
+from database.engine import create_engine
+from database.migrations.migrate import run_migrations
+from database.repositories.users import RankIndex, UserCache, UserRepository
+from database.repositories.xp import XPRepository
+
+USERS = (101, 102, 103)
+
+
+async def _flush(db, users: UserRepository, xp: XPRepository,
+                 batch: list[tuple[int, int, int, int, int]], fail: bool) -> None:
+    def entries():
+        for user_id, amount, *_ in batch:
+            yield user_id, amount, XPSource.MESSAGE, None
+        if fail:
+            raise RuntimeError("simulated failure while writing xp_history")
+
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def read_meanwhile():
+        await started.wait()
+        await users.get_many(list(USERS))
+        release.set()
+
+    reader = asyncio.create_task(read_meanwhile())
+    try:
+        async with db.transaction():
+            await users.apply_xp_batch(batch)
+            started.set()
+            await asyncio.sleep(0.05)
+            await xp.bulk_import(entries())
+    finally:
+        started.set()
+        await reader
+
+
+async def check() -> list[str]:
+    problems: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db = await create_engine(f"sqlite:///{tmp}/check.db")
+        try:
+            await run_migrations(db)
+            ranks = RankIndex()
+            users = UserRepository(db, UserCache(), ranks)
+            xp = XPRepository(db)
+            for user_id in USERS:
+                await users.upsert(user_id, status="approved")
+            await users.load_rank_index()
+            await users.get_many(list(USERS))  # warm the cache
+
+            batch = [(user_id, 25 * i, 0, 1, 0) for i, user_id in enumerate(USERS, 1)]
+            try:
+                await _flush(db, users, xp, batch, fail=True)
+                problems.append("the simulated failure did not raise")
+            except RuntimeError:
+                pass
+            await _flush(db, users, xp, batch, fail=False)
+
+            stored = await users.get_xp_many(list(USERS))
+            cached = {u.user_id: u.total_xp for u in await users.get_many(list(USERS))}
+            for user_id, amount, *_ in batch:
+                total = stored[user_id][0]
+                if total != amount:
+                    problems.append(f"user {user_id}: stored total_xp {total}, expected {amount}")
+                if ranks.xp_of(user_id) != total:
+                    problems.append(f"user {user_id}: rank index has {ranks.xp_of(user_id)}, stored {total}")
+                if cached[user_id] != total:
+                    problems.append(f"user {user_id}: cache has {cached[user_id]}, stored {total}")
+        finally:
+            await db.close()
+    return problems
+
+
+def main(argv: list[str] | None = None) -> int:
+    argparse.ArgumentParser(description=__doc__.splitlines()[0]).parse_args(argv)
+    problems = asyncio.run(check())
+    for problem in problems:
+        print(f"[FAIL] {problem}")
+    print("Failed flush + retry: " + ("ok" if not problems else f"{len(problems)} problem(s)"))
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
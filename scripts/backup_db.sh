@@ -1,5 +1,6 @@
 #!/bin/bash
-# SQLite backup script — run via cron for regular backups
+# SQLite backup script for when the bot is stopped.
+# While it runs, the bot backs itself up (database.backup in config.yaml, /backup-db).
 set -e
 
 cd "$(dirname "$0")/.."
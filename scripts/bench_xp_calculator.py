@@ -0,0 +1,85 @@
+"""Benchmark XPCalculator against the old level-by-level loops.
+
+    python scripts/bench_xp_calculator.py [--samples 100000]
+
+Checks that both give the same answers first, then times calculate_level,
+total_xp_for_level and xp_progress_in_level, plus levels_for over the
+whole sample.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.xp_calculator import XPCalculator  # noqa: E402
+
+
+def loop_total_xp_for_level(level: int) -> int:
+    total = 0
+    for k in range(1, level + 1):
+        total += 50 * (k ** 2) + 50 * k
+    return total
+
+
+def loop_calculate_level(total_xp: int) -> int:
+    level = 0
+    cumulative = 0
+    while True:
+        next_needed = 50 * ((level + 1) ** 2) + 50 * (level + 1)
+        if cumulative + next_needed > total_xp:
+            break
+        cumulative += next_needed
+        level += 1
+    return level
+
+
+def loop_xp_progress_in_level(total_xp: int) -> tuple[int, int]:
+    level = loop_calculate_level(total_xp)
+    cumulative = loop_total_xp_for_level(level)
+    return total_xp - cumulative, 50 * ((level + 1) ** 2) + 50 * (level + 1)
+
+
+def _time(label: str, old, new, values: list[int]) -> None:
+    old_s = timeit.timeit(lambda: [old(v) for v in values], number=1)
+    new_s = timeit.timeit(lambda: [new(v) for v in values], number=1)
+    per = 1e9 / len(values)
+    print(f"{label:<26} loop {old_s * per:8.0f} ns   new {new_s * per:8.0f} ns   x{old_s / new_s:6.1f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    # Mostly realistic totals (levels 0-60), with a tail of very high ones
+    totals = [rng.randint(0, XPCalculator.total_xp_for_level(60)) for _ in range(args.samples)]
+    totals += [rng.randint(0, XPCalculator.total_xp_for_level(1500)) for _ in range(args.samples // 100)]
+    levels = [rng.randint(0, 100) for _ in range(args.samples)]
+
+    for xp in totals[:5000] + [0, -1, 99, 100, 299, 300]:
+        assert XPCalculator.calculate_level(xp) == loop_calculate_level(xp), xp
+        assert XPCalculator.xp_progress_in_level(xp) == loop_xp_progress_in_level(xp), xp
+    for level in range(0, 1100):
+        assert XPCalculator.total_xp_for_level(level) == loop_total_xp_for_level(level), level
+    assert XPCalculator.levels_for(totals) == [XPCalculator.calculate_level(xp) for xp in totals]
+    print(f"Results match ({len(totals):,} totals)\n")
+
+    _time("calculate_level", loop_calculate_level, XPCalculator.calculate_level, totals)
+    _time("total_xp_for_level", loop_total_xp_for_level, XPCalculator.total_xp_for_level, levels)
+    _time("xp_progress_in_level", loop_xp_progress_in_level, XPCalculator.xp_progress_in_level, totals)
+
+    old_s = timeit.timeit(lambda: [loop_calculate_level(v) for v in totals], number=1)
+    new_s = timeit.timeit(lambda: XPCalculator.levels_for(totals), number=1)
+    print(f"{'levels_for':<26} loop {old_s * 1000:8.1f} ms   new {new_s * 1000:8.1f} ms   x{old_s / new_s:6.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Database maintenance — keeps the SQLite WAL short and the planner statistics fresh"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from database.engine import DatabaseEngine
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseMaintenance:
+    """
+    Background housekeeping for the SQLite engine.
+
+    Every ``check_interval_seconds`` it looks at how long the database has
+    gone without a write. Once it has been quiet for ``quiet_seconds`` it
+    runs a PASSIVE WAL checkpoint, escalating to TRUNCATE when the -wal file
+    has grown past ``wal_truncate_mb``. ``PRAGMA optimize``, incremental
+    vacuum and a full ANALYZE run on their own, longer intervals, also only
+    when quiet. Does nothing on PostgreSQL.
+    """
+
+    def __init__(self, db: DatabaseEngine, settings: dict[str, Any]):
+        self.db = db
+        self.check_interval = settings.get("check_interval_seconds", 60)
+        self.quiet_seconds = settings.get("quiet_seconds", 30)
+        self.wal_truncate_bytes = settings.get("wal_truncate_mb", 64) * 1024 * 1024
+        self.optimize_interval = settings.get("optimize_hours", 6) * 3600
+        self.analyze_interval = settings.get("analyze_hours", 24) * 3600
+        self.vacuum_pages = settings.get("vacuum_pages", 1000)
+        self._enabled = settings.get("enabled", True)
+        self._task: asyncio.Task | None = None
+        now = time.monotonic()
+        self._last_optimize = now
+        self._last_analyze = now
+        self.last_checkpoint: tuple[int, int, int] | None = None
+
+    @property
+    def supported(self) -> bool:
+        return hasattr(self.db, "checkpoint")
+
+    def start(self) -> None:
+        if not self._enabled or not self.supported:
+            return
+        if self._task is not None:
+            logger.warning("Database maintenance already running")
+            return
+        self._task = asyncio.create_task(self._loop())
+        logger.info("Database maintenance started (quiet after %ss)", self.quiet_seconds)
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            logger.info("Database maintenance stopped")
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Database maintenance pass failed")
+
+    async def run_once(self, force: bool = False) -> None:
+        """One maintenance pass; skipped unless the database is quiet or ``force`` is set."""
+        if not force and self.db.idle_seconds() < self.quiet_seconds:
+            return
+
+        stats = await self.db.storage_stats()
+        mode = "TRUNCATE" if stats["wal_bytes"] >= self.wal_truncate_bytes else "PASSIVE"
+        self.last_checkpoint = await self.db.checkpoint(mode)
+        logger.debug("WAL checkpoint (%s): %s", mode, self.last_checkpoint)
+
+        now = time.monotonic()
+        if force or now - self._last_optimize >= self.optimize_interval:
+            await self.db.optimize()
+            freed = await self.db.incremental_vacuum(self.vacuum_pages)
+            self._last_optimize = now
+            logger.info("PRAGMA optimize done, %d free pages released", freed)
+
+        if force or now - self._last_analyze >= self.analyze_interval:
+            await self.db.analyze()
+            self._last_analyze = now
+            logger.info("ANALYZE done")
@@ -1,17 +1,32 @@
 from __future__ import annotations
 
 import math
-from typing import TYPE_CHECKING
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Iterable
 
 if TYPE_CHECKING:
     from core.config import Config
 
+# Levels covered by the lookup table; higher totals are solved from the closed form
+TABLE_LEVELS = 1000
+
+
+def _total_xp(level: int) -> int:
+    # sum(50k^2 + 50k, k=1..L) = 50 * L(L+1)(L+2) / 3
+    return 50 * level * (level + 1) * (level + 2) // 3
+
+
+# _CUMULATIVE[L] = total XP needed to reach level L
+_CUMULATIVE: list[int] = [_total_xp(level) for level in range(TABLE_LEVELS + 1)]
+
 
 class XPCalculator:
     """Level math and milestone detection.
 
     Formula: xp_needed(level) = 50 * level^2 + 50 * level
-    Total XP to reach level N = sum of xp_needed(1..N)
+    Total XP to reach level N = sum of xp_needed(1..N) = 50 * N(N+1)(N+2) / 3
+
+    Level lookups bisect a precomputed table of cumulative totals.
     """
 
     def __init__(self, config: Config):
@@ -27,42 +42,44 @@ class XPCalculator:
     @staticmethod
     def total_xp_for_level(level: int) -> int:
         """Cumulative XP needed to reach a given level from 0."""
-        # Sum of 50*k^2 + 50*k for k=1..level
-        # = 50 * (level)(level+1)(2level+1)/6 + 50 * level*(level+1)/2
-        total = 0
-        for k in range(1, level + 1):
-            total += 50 * (k ** 2) + 50 * k
-        return total
+        if level <= 0:
+            return 0
+        return _total_xp(level)
 
     @staticmethod
     def calculate_level(total_xp: int) -> int:
         """Calculate level from total XP."""
-        level = 0
-        cumulative = 0
-        while True:
-            next_needed = 50 * ((level + 1) ** 2) + 50 * (level + 1)
-            if cumulative + next_needed > total_xp:
-                break
-            cumulative += next_needed
+        if total_xp < _CUMULATIVE[-1]:
+            return max(bisect_right(_CUMULATIVE, total_xp) - 1, 0)
+        # Past the table: start from the cube-root estimate and correct the rounding
+        level = int(math.cbrt(3 * total_xp / 50))
+        while _total_xp(level + 1) <= total_xp:
             level += 1
+        while _total_xp(level) > total_xp:
+            level -= 1
         return level
 
+    @staticmethod
+    def levels_for(totals: Iterable[int]) -> list[int]:
+        """``calculate_level`` for many totals at once (flushes, imports, reconciliation)."""
+        table, top = _CUMULATIVE, _CUMULATIVE[-1]
+        return [
+            max(bisect_right(table, xp) - 1, 0) if xp < top else XPCalculator.calculate_level(xp)
+            for xp in totals
+        ]
+
     @staticmethod
     def xp_to_next_level(total_xp: int) -> int:
         """XP remaining until next level up."""
         level = XPCalculator.calculate_level(total_xp)
-        cumulative = XPCalculator.total_xp_for_level(level)
-        next_needed = 50 * ((level + 1) ** 2) + 50 * (level + 1)
-        return cumulative + next_needed - total_xp
+        return XPCalculator.total_xp_for_level(level + 1) - total_xp
 
     @staticmethod
     def xp_progress_in_level(total_xp: int) -> tuple[int, int]:
         """Returns (current_xp_in_level, xp_needed_for_level)."""
         level = XPCalculator.calculate_level(total_xp)
-        cumulative = XPCalculator.total_xp_for_level(level)
-        current_in_level = total_xp - cumulative
-        needed = 50 * ((level + 1) ** 2) + 50 * (level + 1)
-        return current_in_level, needed
+        current_in_level = total_xp - XPCalculator.total_xp_for_level(level)
+        return current_in_level, XPCalculator.xp_for_level(level + 1)
 
     def check_milestones(self, old_level: int, new_level: int) -> list[int]:
         """Return list of milestone levels crossed between old and new level."""
@@ -27,7 +27,7 @@ class AgeVerifyView(PersistentView):
         emoji="\U0001f510",
     )
     async def start_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        user_repo = UserRepository(self.bot.db)
+        user_repo = UserRepository(self.bot.db, self.bot.user_cache, self.bot.rank_index)
         user = await user_repo.get(interaction.user.id)
 
         if not user:
@@ -34,7 +34,7 @@ class RejectReasonModal(discord.ui.Modal, title="Rejection Reason"):
 
     async def on_submit(self, interaction: discord.Interaction):
         intro_repo = IntroRepository(self.bot.db)
-        user_repo = UserRepository(self.bot.db)
+        user_repo = UserRepository(self.bot.db, self.bot.user_cache, self.bot.rank_index)
         intro = await intro_repo.get(self.intro_id)
         if not intro:
             await interaction.response.send_message("Intro not found.", ephemeral=True)
@@ -179,7 +179,7 @@ class IntroReviewView(PersistentView):
 async def _handle_approve(bot: GayborhoodBot, interaction: discord.Interaction, intro_id: int):
     """Handle intro approval: assign roles, post welcome, award XP."""
     intro_repo = IntroRepository(bot.db)
-    user_repo = UserRepository(bot.db)
+    user_repo = UserRepository(bot.db, bot.user_cache, bot.rank_index)
 
     intro = await intro_repo.get(intro_id)
     if not intro:
@@ -31,7 +31,7 @@ class OnboardingView(PersistentView):
         row=0,
     )
     async def agree_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        user_repo = UserRepository(self.bot.db)
+        user_repo = UserRepository(self.bot.db, self.bot.user_cache, self.bot.rank_index)
         rules_repo = RulesRepository(self.bot.db)
 
         # Check if already agreed